@@ -1,16 +1,57 @@
 """ChaiLab - A Gradio-like interface using shadcn/ui components."""
 
-from .blocks import Blocks
-from .chat_interface import ChatInterface
-from .interface import Interface
-from . import ui
-from . import themes
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from ._version import __version__
 
+# Public names and the submodules defining them. They are imported on first
+# access so that ``import chailab`` stays cheap.
+_EXPORTS = {
+    "Blocks": "blocks",
+    "ChatInterface": "chat_interface",
+    "Hub": "hub",
+    "Interface": "interface",
+    "cancellation_token": "context",
+    "is_cancelled": "context",
+    "progress": "context",
+}
+_SUBMODULES = {"ui", "themes"}
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    from . import themes, ui
+    from .blocks import Blocks
+    from .chat_interface import ChatInterface
+    from .context import cancellation_token, is_cancelled, progress
+    from .hub import Hub
+    from .interface import Interface
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted({*globals(), *__all__})
+
+
 __all__ = [
     "Blocks",
     "ChatInterface",
+    "Hub",
     "Interface",
+    "cancellation_token",
+    "is_cancelled",
+    "progress",
     "ui",
     "themes",
 ]
@@ -0,0 +1,40 @@
+"""The web stack (FastAPI, Starlette and uvicorn), imported on first use.
+
+Modules refer to ``_web.Request`` and friends instead of importing FastAPI at
+module level, so ``import chailab`` and building interfaces stay cheap in
+processes that never serve, such as CLI tools and process-pool workers.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+_SOURCES = {
+    "FastAPI": "fastapi",
+    "Request": "fastapi",
+    "WebSocket": "fastapi",
+    "WebSocketDisconnect": "fastapi",
+    "CORSMiddleware": "fastapi.middleware.cors",
+    "JSONResponse": "fastapi.responses",
+    "PlainTextResponse": "fastapi.responses",
+    "Response": "fastapi.responses",
+    "StreamingResponse": "fastapi.responses",
+}
+
+if TYPE_CHECKING:  # pragma: no cover - static analysis only
+    import uvicorn
+    from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+
+def __getattr__(name: str) -> Any:
+    if name == "uvicorn":
+        value = importlib.import_module("uvicorn")
+    elif name in _SOURCES:
+        value = getattr(importlib.import_module(_SOURCES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
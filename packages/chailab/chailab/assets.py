@@ -0,0 +1,154 @@
+"""Pre-rendered HTTP assets with validators and precompressed variants."""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from . import _web
+
+try:  # pragma: no cover - optional dependency
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - brotli unavailable
+    brotli = None
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    encodings: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[token] = quality
+    return encodings
+
+
+def _accepts(encodings: Dict[str, float], name: str) -> bool:
+    if name in encodings:
+        return encodings[name] > 0
+    return encodings.get("*", 0) > 0
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    """An immutable response body rendered once and served many times.
+
+    The asset keeps identity, gzip and (when the ``brotli`` package is
+    installed) brotli encodings side by side, each with its own strong ETag.
+    """
+
+    body: bytes
+    media_type: str
+    cache_control: str = "no-cache"
+    digest: str = field(init=False)
+    variants: Dict[str, bytes] = field(init=False)
+
+    def __post_init__(self) -> None:
+        variants = {"identity": self.body}
+        variants["gzip"] = gzip.compress(self.body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(self.body)
+        object.__setattr__(self, "digest", hashlib.sha256(self.body).hexdigest())
+        object.__setattr__(self, "variants", variants)
+
+    @classmethod
+    def from_text(cls, text: str, media_type: str, *, cache_control: str = "no-cache") -> "StaticAsset":
+        return cls(text.encode("utf-8"), media_type, cache_control)
+
+    def etag(self, encoding: str = "identity") -> str:
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.digest[:32]}{suffix}"'
+
+    def _matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        known = {self.etag(encoding) for encoding in self.variants}
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate in known:
+                return True
+        return False
+
+    def _negotiate(self, accept_encoding: str) -> str:
+        encodings = _parse_accept_encoding(accept_encoding)
+        for name in ("br", "gzip"):
+            if name in self.variants and _accepts(encodings, name):
+                return name
+        return "identity"
+
+    def respond(self, request: _web.Request) -> _web.Response:
+        """Return the best variant for ``request`` or ``304 Not Modified``."""
+
+        encoding = self._negotiate(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etag(encoding),
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match: Optional[str] = request.headers.get("if-none-match")
+        if if_none_match and self._matches(if_none_match):
+            return _web.Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return _web.Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+class StaticBundle:
+    """Frontend files shipped inside the package, served under hashed names.
+
+    ``interface.js`` is exposed as ``interface.<hash>.js`` so browsers can
+    cache every file forever; a new release changes the name instead.
+    """
+
+    def __init__(self, directory: Path = STATIC_DIR) -> None:
+        self._assets: Dict[str, StaticAsset] = {}
+        self._names: Dict[str, str] = {}
+        for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+            name = path.relative_to(directory).as_posix()
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = StaticAsset(path.read_bytes(), media_type, IMMUTABLE)
+            stem, _, suffix = name.rpartition(".")
+            hashed = f"{stem}.{asset.digest[:12]}.{suffix}"
+            self._assets[hashed] = asset
+            self._names[name] = hashed
+
+    def url(self, name: str, prefix: str = "static") -> str:
+        """Return the cache-busting URL for the packaged file ``name``.
+
+        The default is relative to the page, so it holds under a mount prefix.
+        """
+
+        return f"{prefix}/{self._names[name]}"
+
+    def get(self, hashed_name: str) -> Optional[StaticAsset]:
+        return self._assets.get(hashed_name)
+
+
+@functools.lru_cache(maxsize=None)
+def static_bundle() -> StaticBundle:
+    """Load the packaged frontend once per process."""
+
+    return StaticBundle()
+
+
+__all__ = ["IMMUTABLE", "StaticAsset", "StaticBundle", "static_bundle"]
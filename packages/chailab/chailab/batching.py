@@ -0,0 +1,109 @@
+"""Dynamic request batching for ``Interface`` predictions."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .context import bind_reporter, bind_token
+
+BatchRunner = Callable[[List[List[Any]]], Awaitable[List[List[Any]]]]
+
+
+@dataclass
+class BatchStats:
+    """Running counters describing the batches dispatched so far."""
+
+    batches: int = 0
+    items: int = 0
+    largest: int = 0
+    sizes: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, size: int) -> None:
+        self.batches += 1
+        self.items += size
+        self.largest = max(self.largest, size)
+        self.sizes[size] = self.sizes.get(size, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.largest,
+            "histogram": {str(size): count for size, count in sorted(self.sizes.items())},
+        }
+
+
+class Batcher:
+    """Collect concurrent calls into batches handed to ``run_batch``.
+
+    A batch is dispatched once ``max_batch_size`` items are waiting or
+    ``max_batch_wait_ms`` have passed since its first item arrived. Batches
+    run one at a time; requests arriving meanwhile form the next batch.
+    """
+
+    def __init__(self, run_batch: BatchRunner, *, max_batch_size: int = 4, max_batch_wait_ms: float = 10.0) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_batch_wait_ms < 0:
+            raise ValueError("max_batch_wait_ms must not be negative.")
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait_ms / 1000
+        self.stats = BatchStats()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, inputs: List[Any]) -> List[Any]:
+        """Queue one request's inputs and wait for its share of the batch."""
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+
+        future: asyncio.Future = loop.create_future()
+        self._queue.put_nowait((inputs, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[List[Any], asyncio.Future]]:
+        batch = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            try:
+                if timeout <= 0:
+                    batch.append(queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return batch
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        # The worker task inherits the context of whichever request started
+        # it; a batch serves many requests, so it reports to and is cancelled by none.
+        bind_reporter(None)
+        bind_token(None)
+        while True:
+            batch = [item for item in await self._collect(queue) if not item[1].done()]
+            if not batch:
+                continue
+            self.stats.record(len(batch))
+            try:
+                results = await self.run_batch([inputs for inputs, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+__all__ = ["BatchStats", "Batcher"]
@@ -0,0 +1,437 @@
+"""Load generator and latency report for ChaiLab apps.
+
+Drive an app in-process through its ASGI interface, or over a local socket,
+at a fixed concurrency with a weighted mix of requests::
+
+    from chailab.bench import run
+
+    result = run(demo, concurrency=16, requests=500)
+    print(result.report())
+    result.save("baseline.json")
+
+The same is available as ``chailab bench module:demo``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from .blocks import Blocks
+
+Target = Union[Blocks, str]
+Parts = List[Tuple[float, bytes]]
+
+_STREAM_EVENTS = ("chunk", "outputs")
+# Regressions are judged on these statistics; higher is worse except throughput.
+_COMPARED = (("latency", "p50"), ("latency", "p95"), ("latency", "p99"), ("ttfc", "p95"), ("inter_chunk", "p95"))
+
+
+@dataclass
+class Scenario:
+    """One kind of request in the benchmark mix, chosen with probability ~ ``weight``."""
+
+    path: str
+    payload: Dict[str, Any]
+    weight: float = 1.0
+    name: str = ""
+
+    def __post_init__(self) -> None:
+        self.name = self.name or self.path
+
+    @property
+    def streaming(self) -> bool:
+        return self.path.endswith("/stream")
+
+
+@dataclass
+class _Sample:
+    ok: bool
+    latency: float
+    first_chunk: Optional[float] = None
+    gaps: List[float] = field(default_factory=list)
+
+
+def _default_input(config: Dict[str, Any]) -> Any:
+    value = config["props"].get("value")
+    if config["type"] == "slider":
+        return value[0] if isinstance(value, list) else (value if value is not None else config["props"].get("min", 0))
+    return value if value is not None else ""
+
+
+def default_scenarios(app: Blocks) -> List[Scenario]:
+    """A representative request for ``app``, using its components' default values."""
+
+    from .chat_interface import ChatInterface
+    from .interface import Interface
+
+    if isinstance(app, Interface):
+        inputs = [_default_input(config) for config in app._build_component_configs()["inputs"]]
+        path = "/api/predict/stream" if app.is_streaming else "/api/predict"
+        return [Scenario(path, {"inputs": inputs})]
+    if isinstance(app, ChatInterface):
+        return [Scenario("/api/chat/stream", {"message": "Hello", "history": []})]
+    raise TypeError(f"No default scenarios for {type(app).__name__}; pass scenarios explicitly.")
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:  # nearest-rank percentile
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": ordered[-1],
+    }
+
+
+# ----------------------------------------------------------------------
+# Transports
+# ----------------------------------------------------------------------
+class _ASGIClient:
+    """Minimal in-process HTTP client that timestamps every body message.
+
+    ``httpx.ASGITransport`` buffers the whole response, which hides
+    time-to-first-chunk, so requests are driven through the ASGI interface
+    directly.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def post(self, path: str, body: bytes) -> Tuple[int, Parts]:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"chailab"), (b"content-type", b"application/json")],
+            "client": ("127.0.0.1", 0),
+            "server": ("chailab", 80),
+        }
+        sent = False
+        finished = asyncio.Event()
+        status = 500
+        parts: Parts = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                if message.get("body"):
+                    parts.append((time.perf_counter(), message["body"]))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            finished.set()
+        return status, parts
+
+    async def close(self) -> None:
+        pass
+
+
+class _SocketClient:
+    def __init__(self, base_url: str, concurrency: int) -> None:
+        try:
+            import httpx
+        except ImportError:  # pragma: no cover - optional dependency
+            raise RuntimeError("Benchmarking over a socket requires httpx: pip install httpx") from None
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        self._client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=None)
+
+    async def post(self, path: str, body: bytes) -> Tuple[int, Parts]:
+        parts: Parts = []
+        headers = {"content-type": "application/json"}
+        async with self._client.stream("POST", path, content=body, headers=headers) as response:
+            async for chunk in response.aiter_raw():
+                parts.append((time.perf_counter(), chunk))
+        return response.status_code, parts
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def _measure(scenario: Scenario, start: float, status: int, parts: Parts) -> _Sample:
+    end = parts[-1][0] if parts else time.perf_counter()
+    sample = _Sample(ok=200 <= status < 300, latency=end - start)
+    if not scenario.streaming or not sample.ok:
+        return sample
+    buffer = b""
+    last: Optional[float] = None
+    for stamp, chunk in parts:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            kind = json.loads(line).get("type")
+            if kind == "error":
+                sample.ok = False
+            elif kind in _STREAM_EVENTS:
+                if last is None:
+                    sample.first_chunk = stamp - start
+                else:
+                    sample.gaps.append(stamp - last)
+                last = stamp
+    return sample
+
+
+# ----------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------
+@dataclass
+class BenchResult:
+    """Throughput and latency statistics of one benchmark run."""
+
+    concurrency: int
+    duration: float
+    scenarios: Dict[str, Dict[str, Any]]
+
+    @classmethod
+    def from_samples(cls, concurrency: int, duration: float, samples: Dict[str, List[_Sample]]) -> "BenchResult":
+        scenarios = {}
+        for name, runs in samples.items():
+            ok = [run for run in runs if run.ok]
+            stats: Dict[str, Any] = {
+                "requests": len(runs),
+                "errors": len(runs) - len(ok),
+                "throughput": len(ok) / duration if duration else 0.0,
+                "latency": _percentiles([run.latency for run in ok]),
+            }
+            first = [run.first_chunk for run in ok if run.first_chunk is not None]
+            if first:
+                stats["ttfc"] = _percentiles(first)
+                stats["inter_chunk"] = _percentiles([gap for run in ok for gap in run.gaps])
+                stats["chunks"] = sum(len(run.gaps) + 1 for run in ok if run.first_chunk is not None)
+            scenarios[name] = stats
+        return cls(concurrency=concurrency, duration=duration, scenarios=scenarios)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"concurrency": self.concurrency, "duration": self.duration, "scenarios": self.scenarios}
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BenchResult":
+        data = json.loads(Path(path).read_text())
+        return cls(concurrency=data["concurrency"], duration=data["duration"], scenarios=data["scenarios"])
+
+    def report(self) -> str:
+        lines = [f"concurrency {self.concurrency}, {self.duration:.2f}s"]
+        for name, stats in self.scenarios.items():
+            lines.append(
+                f"{name}: {stats['requests']} requests, {stats['errors']} errors, "
+                f"{stats['throughput']:.1f} req/s"
+            )
+            for key, label in (("latency", "latency"), ("ttfc", "first chunk"), ("inter_chunk", "inter-chunk")):
+                dist = stats.get(key)
+                if dist:
+                    lines.append(
+                        f"  {label:<12} p50 {dist['p50'] * 1000:8.2f} ms  p95 {dist['p95'] * 1000:8.2f} ms  "
+                        f"p99 {dist['p99'] * 1000:8.2f} ms"
+                    )
+        return "\n".join(lines)
+
+    def compare(self, baseline: "BenchResult", tolerance: float = 0.1) -> List[Dict[str, Any]]:
+        """Compare against ``baseline``; rows flag changes worse than ``tolerance``.
+
+        Throughput may drop, and latency percentiles may rise, by at most
+        ``tolerance`` (a fraction) before a row counts as a regression.
+        """
+
+        rows: List[Dict[str, Any]] = []
+        for name, stats in self.scenarios.items():
+            base = baseline.scenarios.get(name)
+            if base is None:
+                continue
+            checks = [("throughput", None, base["throughput"], stats["throughput"], False)]
+            checks += [
+                (key, stat, base[key][stat], stats[key][stat], True)
+                for key, stat in _COMPARED
+                if stat in base.get(key, {}) and stat in stats.get(key, {})
+            ]
+            for key, stat, before, after, higher_is_worse in checks:
+                change = (after - before) / before if before else 0.0
+                worse = change if higher_is_worse else -change
+                rows.append(
+                    {
+                        "scenario": name,
+                        "metric": f"{key}.{stat}" if stat else key,
+                        "baseline": before,
+                        "current": after,
+                        "change": change,
+                        "regression": worse > tolerance,
+                    }
+                )
+        return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = []
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        if row["metric"] == "throughput":
+            baseline, current = f"{row['baseline']:.1f} req/s", f"{row['current']:.1f} req/s"
+        else:
+            baseline, current = f"{row['baseline'] * 1000:.2f} ms", f"{row['current'] * 1000:.2f} ms"
+        lines.append(
+            f"{row['scenario']:<24} {row['metric']:<18} {baseline:>12} -> {current:>12} "
+            f"({row['change'] * 100:+6.1f}%) {flag}"
+        )
+    return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+@contextlib.asynccontextmanager
+async def _client(target: Target, socket: bool, concurrency: int) -> AsyncIterator[Any]:
+    if isinstance(target, str):
+        client: Any = _SocketClient(target, concurrency)
+        try:
+            yield client
+        finally:
+            await client.close()
+        return
+
+    if socket:
+        host, port = "127.0.0.1", _free_port()
+        target.launch(host=host, port=port, block=False, open_browser=False, inline=False, log_level="warning")
+        client = _SocketClient(f"http://{host}:{port}", concurrency)
+        try:
+            yield client
+        finally:
+            await client.close()
+            target.close()
+        return
+
+    app = target._ensure_app()
+    async with app.router.lifespan_context(app):
+        yield _ASGIClient(app)
+
+
+def _free_port() -> int:
+    import socket
+
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_async(
+    target: Target,
+    scenarios: Optional[Sequence[Scenario]] = None,
+    *,
+    concurrency: int = 8,
+    requests: Optional[int] = 200,
+    duration: Optional[float] = None,
+    warmup: int = 0,
+    socket: bool = False,
+    seed: int = 0,
+) -> BenchResult:
+    """Benchmark ``target`` and return its statistics.
+
+    Args:
+        target: A ChaiLab app, benchmarked in-process unless ``socket`` is
+            set, or the base URL of a running server.
+        scenarios: Request mix; defaults to :func:`default_scenarios`.
+        concurrency: Number of requests kept in flight.
+        requests: Total requests to send (ignored when ``duration`` is set).
+        duration: Run for this many seconds instead of a fixed count. One of
+            ``requests`` and ``duration`` is required.
+        warmup: Requests sent, and discarded, before measuring.
+        socket: Serve an app object on a local port and benchmark over HTTP.
+        seed: Seed for choosing scenarios, for repeatable mixes.
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+    if duration is None and requests is None:
+        raise ValueError("Pass requests or duration.")
+    if scenarios is None:
+        if isinstance(target, str):
+            raise ValueError("Pass scenarios when benchmarking a URL.")
+        scenarios = default_scenarios(target)
+    if not scenarios:
+        raise ValueError("At least one scenario is required.")
+
+    rng = random.Random(seed)
+    weights = [scenario.weight for scenario in scenarios]
+    bodies = {scenario.name: json.dumps(scenario.payload).encode() for scenario in scenarios}
+    samples: Dict[str, List[_Sample]] = {scenario.name: [] for scenario in scenarios}
+
+    async with _client(target, socket, concurrency) as client:
+
+        async def one(record: bool) -> None:
+            scenario = rng.choices(scenarios, weights)[0]
+            start = time.perf_counter()
+            try:
+                status, parts = await client.post(scenario.path, bodies[scenario.name])
+            except Exception:
+                status, parts = 0, []
+            if record:
+                samples[scenario.name].append(_measure(scenario, start, status, parts))
+
+        for _ in range(warmup):
+            await one(record=False)
+
+        remaining = requests if duration is None else None
+        deadline = time.perf_counter() + duration if duration is not None else None
+
+        async def worker() -> None:
+            nonlocal remaining
+            while True:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+                if remaining is not None:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                await one(record=True)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return BenchResult.from_samples(concurrency, elapsed, samples)
+
+
+def run(target: Target, scenarios: Optional[Sequence[Scenario]] = None, **kwargs: Any) -> BenchResult:
+    """Synchronous wrapper around :func:`run_async`."""
+
+    return asyncio.run(run_async(target, scenarios, **kwargs))
+
+
+__all__ = ["BenchResult", "Scenario", "default_scenarios", "format_comparison", "run", "run_async"]
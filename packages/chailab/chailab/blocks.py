@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import contextvars
+import html
+import inspect
 import socket
 import threading
 import time
 import webbrowser
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
 
-import uvicorn
+from . import _web, frames
+from .assets import StaticAsset, static_bundle
+from .codec import Codec, get_codec
+from .context import CancellationToken, Reporter, bind_reporter, bind_token, unbind_reporter, unbind_token
+from .executors import FunctionExecutor
+from .metrics import CONTENT_TYPE, Metrics, MetricsMiddleware
+from .profiling import Profiler, ProfilerMiddleware, run_profiled
+from .queueing import QueueFullError, RequestQueue, Ticket
 
 
 def _is_notebook_environment() -> bool:
@@ -29,22 +41,132 @@ def _is_notebook_environment() -> bool:
     return shell_name in {"ZMQInteractiveShell", "Shell"}
 
 
+_STREAM_QUEUE_SIZE = 16
+_QUEUE_POLL_INTERVAL = 0.5
+_DISCONNECT_POLL_INTERVAL = 0.5
+_STREAM_CLOSE_TIMEOUT = 1.0
+_DONE = object()
+
+Event = Dict[str, Any]
+T = TypeVar("T")
+
+
+def mount_prefix(path: str) -> str:
+    """Normalise a mount path to ``/name`` form."""
+
+    prefix = "/" + path.strip("/")
+    if prefix == "/":
+        raise ValueError("Mount path must not be the root; serve the interface directly instead.")
+    return prefix
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before its result was ready."""
+
+
+class RequestError(ValueError):
+    """A malformed request, reported as an HTTP error or a socket error event."""
+
+    def __init__(self, message: str, status_code: int = 400, **extra: Any) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.extra = extra
+
+
+async def _iterate_in_thread(
+    gen: Iterator[Any],
+    *,
+    maxsize: int = _STREAM_QUEUE_SIZE,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Any]:
+    """Drive a synchronous generator in a worker thread.
+
+    Items are handed back through a queue holding at most ``maxsize``
+    pending items; the worker blocks once the consumer falls behind. If the
+    consumer stops early the worker stops pulling and closes ``gen``, and
+    the consumer waits briefly for it to finish.
+    """
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(maxsize)
+    stop = threading.Event()
+
+    def publish(item: Any, exc: BaseException | None = None) -> None:
+        with contextlib.suppress(RuntimeError):  # loop already closed
+            loop.call_soon_threadsafe(queue.put_nowait, (item, exc))
+
+    def produce() -> None:
+        try:
+            for item in gen:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                publish(item)
+        except BaseException as exc:  # re-raised on the event loop side
+            publish(_DONE, exc)
+        else:
+            publish(_DONE)
+        finally:
+            gen.close()
+
+    worker = loop.run_in_executor(executor, contextvars.copy_context().run, run_profiled, produce)
+    # Errors from ``gen`` travel through the queue; this only collects the rest.
+    worker.add_done_callback(lambda future: future.cancelled() or future.exception())
+    try:
+        while True:
+            item, exc = await queue.get()
+            if item is _DONE:
+                if exc is not None:
+                    raise exc
+                return
+            slots.release()
+            yield item
+    finally:
+        stop.set()
+        slots.release()
+        # A worker stuck in a slow step of ``gen`` finishes on its own.
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(asyncio.shield(worker), _STREAM_CLOSE_TIMEOUT)
+
+
 @dataclass
 class _ServerHandle:
-    server: uvicorn.Server
+    server: _web.uvicorn.Server
     thread: threading.Thread
 
 
 class Blocks:
     """Minimal runtime that manages the FastAPI app lifecycle."""
 
-    def __init__(self, *, title: str | None = None, description: str | None = None, theme: str = "default") -> None:
+    executor: FunctionExecutor
+
+    def __init__(
+        self,
+        *,
+        title: str | None = None,
+        description: str | None = None,
+        theme: str = "default",
+        concurrency_limit: int | None = None,
+        max_queue_size: int | None = None,
+        metrics: bool | Metrics = False,
+        codec: Codec | str | None = None,
+    ) -> None:
         self.title = title or "ChaiLab"
         self.description = description or ""
         self.theme = theme
+        self.queue = RequestQueue(concurrency_limit, max_queue_size)
+        self.metrics: Metrics | None = Metrics() if metrics is True else (metrics or None)
+        self.codec = get_codec(codec)
+        self.profiler: Profiler | None = None
         self.app = None
+        # Set when mounted under a prefix: labels tell this app's metrics apart
+        # in a shared registry, which a parent app may instrument and serve.
+        self._metric_labels: Dict[str, str] = {}
+        self._parent_serves_metrics = False
         self._server_handle: Optional[_ServerHandle] = None
         self._last_launch_url: Optional[str] = None
+        self.stream_queue_size = _STREAM_QUEUE_SIZE
 
     # ---------------------------------------------------------------------
     # Lifecycle helpers
@@ -57,6 +179,490 @@ class Blocks:
             self.app = self._create_app()
         return self.app
 
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app: _web.FastAPI) -> AsyncIterator[None]:
+        """Start executor workers with the server and release them on shutdown."""
+
+        await self.executor.warm_up()
+        try:
+            yield
+        finally:
+            self.executor.shutdown()
+
+    def _render_html(self) -> str:  # pragma: no cover - implemented by subclasses
+        raise NotImplementedError
+
+    def _build_page(self) -> StaticAsset:
+        """Render the HTML shell once for the current app build."""
+
+        return StaticAsset.from_text(self._render_html(), "text/html")
+
+    def _render_shell(self, config: Dict[str, Any], *, entry: str, container_class: str) -> str:
+        """Return the HTML page that boots the packaged frontend bundle ``entry``."""
+
+        # Relative URLs keep the page working under any mount prefix.
+        bundle = static_bundle()
+        config_json = self.codec.dumps(config).decode("utf-8").replace("</", "<\\/")
+        scripts = "\n".join(
+            f'    <script src="{bundle.url(name)}"></script>'
+            for name in ("vendor/react.production.min.js", "vendor/react-dom.production.min.js", entry)
+        )
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{html.escape(self.title)}</title>
+    <link rel="stylesheet" href="{bundle.url('chailab.css')}" />
+</head>
+<body class="min-h-screen bg-background py-6">
+    <div id="app" class="{container_class}"></div>
+    <script id="chailab-config" type="application/json">{config_json}</script>
+{scripts}
+</body>
+</html>
+"""
+
+    def _mount_common_routes(self, app: _web.FastAPI) -> None:
+        """Register the routes every interface shares."""
+
+        self._mount_static(app)
+        if self.metrics is not None and self._parent_serves_metrics:
+            self._attach_metrics(self.metrics)
+        elif self.metrics is not None:
+            self._mount_metrics(app, self.metrics)
+        if self.profiler is not None:
+            self._mount_profiling(app, self.profiler)
+
+        @app.get("/api/queue")
+        async def queue_status():
+            return self.queue.status()
+
+        @app.websocket("/ws")
+        async def socket(websocket: _web.WebSocket):
+            await self._serve_socket(websocket)
+
+    def _mount_metrics(self, app: _web.FastAPI, metrics: Metrics) -> None:
+        """Instrument ``app`` and serve the Prometheus text format at ``/metrics``."""
+
+        app.add_middleware(MetricsMiddleware, metrics=metrics)
+        self._attach_metrics(metrics)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics_endpoint():
+            return _web.Response(metrics.render(), media_type=CONTENT_TYPE)
+
+    def _attach_metrics(self, metrics: Metrics) -> None:
+        """Feed this app's queue waits and state into ``metrics``."""
+
+        self.queue.on_admit = lambda wait: metrics.phases.observe(wait, phase="queue")
+        self._register_metrics(metrics)
+
+    def _register_metrics(self, metrics: Metrics) -> None:
+        """Expose queue and executor state; subclasses add their own."""
+
+        queue, executor, labels = self.queue, self.executor, self._metric_labels
+        metrics.callback("chailab_queue_active", "Requests holding a concurrency slot.", lambda: queue.active, **labels)
+        metrics.callback("chailab_queue_waiting", "Requests waiting for a slot.", lambda: queue.waiting, **labels)
+        metrics.callback(
+            "chailab_executor_in_flight", "fn calls running in the executor.", lambda: executor.in_flight, **labels
+        )
+        metrics.callback(
+            "chailab_executor_workers", "Calls the executor can run at once.", lambda: executor.capacity, **labels
+        )
+        metrics.callback(
+            "chailab_executor_busy_seconds_total",
+            "Wall time fn calls spent in the executor; divide its rate by workers for utilization.",
+            lambda: executor.busy_seconds,
+            kind="counter",
+            **labels,
+        )
+
+    @staticmethod
+    def _mount_profiling(app: _web.FastAPI, profiler: Profiler) -> None:
+        """Profile opted-in requests and serve the results under ``/debug/profiles``."""
+
+        app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+        @app.get("/debug/profiles", include_in_schema=False)
+        async def list_profiles():
+            return [profile.summary() for profile in reversed(profiler.profiles)]
+
+        @app.get("/debug/profiles/{profile_id}", include_in_schema=False)
+        async def get_profile(profile_id: int, format: str | None = None):
+            profile = profiler.get(profile_id)
+            if profile is None:
+                return _web.JSONResponse({"success": False, "error": "Unknown profile."}, status_code=404)
+            try:
+                if format == "pstats":
+                    return _web.Response(
+                        profile.pstats_dump(),
+                        media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="chailab-{profile_id}.prof"'},
+                    )
+                if format == "collapsed":
+                    return _web.PlainTextResponse(profile.collapsed())
+                if format not in (None, "text"):
+                    raise ValueError(f"Unknown format {format!r}; use text, pstats or collapsed.")
+            except ValueError as exc:
+                return _web.JSONResponse({"success": False, "error": str(exc)}, status_code=400)
+            return _web.PlainTextResponse(profile.text())
+
+    def _phase(self, name: str):
+        """Time one phase of the current request when metrics are enabled."""
+
+        return self.metrics.phase(name) if self.metrics is not None else contextlib.nullcontext()
+
+    @staticmethod
+    def _mount_static(app: _web.FastAPI) -> None:
+        """Serve the packaged frontend under ``/static`` with immutable caching."""
+
+        bundle = static_bundle()
+
+        @app.get("/static/{path:path}")
+        async def static(path: str, request: _web.Request):
+            asset = bundle.get(path)
+            if asset is None:
+                return _web.Response(status_code=404)
+            return asset.respond(request)
+
+    # ------------------------------------------------------------------
+    # Queueing and event helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _busy_response(exc: QueueFullError) -> _web.JSONResponse:
+        return _web.JSONResponse(
+            {"success": False, "error": str(exc)},
+            status_code=503,
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    async def _read_json(self, request: _web.Request) -> Dict[str, Any]:
+        body = await request.body()
+        with self._phase("parse"):
+            try:
+                payload = self.codec.loads(body)
+            except ValueError:
+                raise RequestError("Request body must be JSON.") from None
+        if not isinstance(payload, dict):
+            raise RequestError("Request body must be a JSON object.")
+        return payload
+
+    async def _read_payload(self, request: _web.Request) -> Dict[str, Any]:
+        """Read a JSON body, or a binary frame when the client sent one."""
+
+        if request.headers.get("content-type", "").split(";")[0].strip() != frames.MEDIA_TYPE:
+            return await self._read_json(request)
+        body = await request.body()
+        with self._phase("parse"):
+            try:
+                payload = frames.decode(body, self.codec)
+            except ValueError as exc:
+                raise RequestError(str(exc)) from None
+        if not isinstance(payload, dict):
+            raise RequestError("Request body must be an object.")
+        return payload
+
+    def _negotiated_response(self, request: _web.Request, content: Any) -> _web.Response:
+        """Answer with a binary frame if the client prefers one, JSON otherwise."""
+
+        if not frames.accepts(request.headers.get("accept"), frames.MEDIA_TYPE):
+            return self._json_response(content)
+        with self._phase("serialize"):
+            body = frames.encode(content, self.codec)
+        return _web.Response(body, media_type=frames.MEDIA_TYPE, headers={"Vary": "Accept"})
+
+    def _json_response(self, content: Any, status_code: int = 200) -> _web.Response:
+        with self._phase("serialize"):
+            body = self.codec.dumps(content)
+        return _web.Response(body, status_code=status_code, media_type="application/json")
+
+    @staticmethod
+    def _error_response(exc: RequestError) -> _web.JSONResponse:
+        return _web.JSONResponse({"success": False, "error": str(exc), **exc.extra}, status_code=exc.status_code)
+
+    def _event_response(self, events: AsyncIterator[Event], *, framed: bool = False) -> _web.StreamingResponse:
+        """Stream ``events`` to an HTTP client as newline-delimited JSON.
+
+        With ``framed`` every event is sent as a length-prefixed binary frame
+        instead, so arrays in the outputs travel as raw buffers.
+        """
+
+        codec = self.codec
+
+        async def encode() -> AsyncIterator[bytes]:
+            async for event in events:
+                with self._phase("serialize"):
+                    line = frames.encode_stream_item(event, codec) if framed else codec.dumps(event) + b"\n"
+                yield line
+
+        return _web.StreamingResponse(
+            encode(),
+            media_type=frames.STREAM_MEDIA_TYPE if framed else "application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Vary": "Accept"},
+        )
+
+    async def _queued_events(self, ticket: Ticket, events: Callable[[], AsyncIterator[Event]]) -> AsyncIterator[Event]:
+        """Report the queue position until ``ticket`` is admitted, then relay ``events``."""
+
+        try:
+            position = None
+            while not ticket.admitted:
+                if ticket.position != position:
+                    position = ticket.position
+                    yield {"type": "queue", "position": position, "waiting": self.queue.waiting}
+                await ticket.wait(timeout=_QUEUE_POLL_INTERVAL)
+            async for event in self._bound_events(events):
+                yield event
+        finally:
+            ticket.release()
+
+    @staticmethod
+    def _start(
+        factory: Callable[[], Awaitable[T]],
+        token: CancellationToken,
+        report: Optional[Reporter] = None,
+    ) -> "asyncio.Future[T]":
+        """Run ``factory()`` in a task whose context carries the request's hooks.
+
+        fn sees ``token`` through :func:`chailab.cancellation_token` and its
+        :func:`chailab.progress` calls go to ``report``; executor threads
+        inherit both.
+        """
+
+        reporter = bind_reporter(report)
+        cancellation = bind_token(token)
+        try:
+            return asyncio.ensure_future(factory())
+        finally:
+            unbind_token(cancellation)
+            unbind_reporter(reporter)
+
+    async def _unless_disconnected(self, request: _web.Request, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await ``factory()`` but abandon it once the HTTP client disconnects.
+
+        The task is cancelled, which stops coroutine fns and generators, and
+        the request's cancellation token is set for sync fns. Raises
+        :class:`ClientDisconnected` in that case.
+        """
+
+        token = CancellationToken()
+        task = self._start(factory, token)
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=_DISCONNECT_POLL_INTERVAL)
+                if done:
+                    return task.result()
+                if await request.is_disconnected():
+                    raise ClientDisconnected()
+        finally:
+            if not task.done():
+                token.cancel()
+                task.cancel()
+
+    async def _bound_events(self, events: Callable[[], AsyncIterator[Event]]) -> AsyncIterator[Event]:
+        """Relay ``events`` interleaved with :func:`chailab.progress` reports.
+
+        The events are produced by a separate task bound to a progress
+        reporter and a cancellation token. If the consumer stops early, e.g.
+        because the client disconnected or cancelled, the task is cancelled
+        and the token set.
+        """
+
+        loop = asyncio.get_running_loop()
+        loop_thread = threading.get_ident()
+        pending: asyncio.Queue = asyncio.Queue()
+
+        def report(event: Event) -> None:
+            if threading.get_ident() == loop_thread:
+                pending.put_nowait(event)
+                return
+            with contextlib.suppress(RuntimeError):  # loop already closed
+                loop.call_soon_threadsafe(pending.put_nowait, event)
+
+        async def pump() -> None:
+            try:
+                async for event in events():
+                    pending.put_nowait(event)
+            finally:
+                pending.put_nowait(_DONE)
+
+        token = CancellationToken()
+        task = self._start(pump, token, report)
+        chunks = self.metrics.chunks if self.metrics is not None else None
+        try:
+            while True:
+                event = await pending.get()
+                if event is _DONE:
+                    break
+                if chunks is not None and event["type"] in ("chunk", "outputs"):
+                    chunks.inc()
+                yield event
+            await task
+        finally:
+            if not task.done():
+                token.cancel()
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    # WebSocket transport
+    # ------------------------------------------------------------------
+    async def _socket_events(self, payload: Dict[str, Any]) -> AsyncIterator[Event]:  # pragma: no cover
+        """Yield the events answering one socket message; implemented by subclasses."""
+
+        raise NotImplementedError
+        yield
+
+    async def _serve_socket(self, websocket: _web.WebSocket) -> None:
+        """Multiplex calls over one WebSocket.
+
+        Clients send ``{"id": ..., "type": ..., ...}`` messages and receive
+        the same events as the HTTP streams, each tagged with the call's
+        ``id``. ``{"id": ..., "type": "cancel"}`` stops a running call, and
+        closing the socket cancels every call still in flight. Calls sent
+        with ``"binary": true`` receive their events as binary frames.
+        """
+
+        await websocket.accept()
+        send_lock = asyncio.Lock()
+        calls: Dict[Any, asyncio.Task] = {}
+
+        async def send(event: Event, binary: bool = False) -> None:
+            with self._phase("serialize"):
+                data = frames.encode(event, self.codec) if binary else self.codec.dumps(event).decode("utf-8")
+            async with send_lock:
+                if binary:
+                    await websocket.send_bytes(data)
+                else:
+                    await websocket.send_text(data)
+
+        async def run(call_id: Any, payload: Dict[str, Any]) -> None:
+            binary = bool(payload.get("binary"))
+            try:
+                async for event in self._socket_events(payload):
+                    await send({**event, "id": call_id}, binary)
+            except QueueFullError as exc:
+                await send({"id": call_id, "type": "error", "error": str(exc), "retry_after": exc.retry_after})
+            except RequestError as exc:
+                await send(
+                    {"id": call_id, "type": "error", "error": str(exc), "status": exc.status_code, **exc.extra}
+                )
+            except _web.WebSocketDisconnect:
+                pass
+            except Exception as exc:
+                # Always end the call with a terminal event, e.g. when an
+                # event cannot be encoded; sent as text in case framing failed.
+                with contextlib.suppress(Exception):
+                    await send({"id": call_id, "type": "error", "error": str(exc)})
+            finally:
+                if calls.get(call_id) is asyncio.current_task():
+                    del calls[call_id]
+
+        try:
+            while True:
+                text = await websocket.receive_text()
+                try:
+                    with self._phase("parse"):
+                        message = self.codec.loads(text)
+                except ValueError:
+                    await send({"id": None, "type": "error", "error": "Messages must be JSON objects."})
+                    continue
+                if not isinstance(message, dict):
+                    await send({"id": None, "type": "error", "error": "Messages must be JSON objects."})
+                    continue
+                call_id = message.get("id")
+                if message.get("type") == "cancel":
+                    task = calls.pop(call_id, None)
+                    if task is not None:
+                        task.cancel()
+                        await send({"id": call_id, "type": "cancelled"})
+                    continue
+                if call_id in calls:
+                    await send({"id": call_id, "type": "error", "error": "Duplicate call id."})
+                    continue
+                calls[call_id] = asyncio.create_task(run(call_id, message))
+        except _web.WebSocketDisconnect:
+            pass
+        finally:
+            for task in calls.values():
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    # Execution helpers
+    # ------------------------------------------------------------------
+    async def _call_fn(self, fn: Callable, *args: Any) -> Any:
+        """Invoke ``fn`` without blocking the event loop."""
+
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await self.executor.run(fn, *args)
+
+    async def _iterate_result(self, result: Any) -> AsyncIterator[Any]:
+        """Yield each item produced by a (async) generator result.
+
+        Plain return values are yielded once so callers can treat every
+        result as a stream. Synchronous generators are driven in a worker
+        thread so their bodies never block the event loop.
+        """
+
+        if inspect.isasyncgen(result):
+            async for item in result:
+                yield item
+        elif inspect.isgenerator(result):
+            async for item in _iterate_in_thread(
+                result, maxsize=self.stream_queue_size, executor=self.executor.thread_pool
+            ):
+                yield item
+        else:
+            yield result
+
+    async def _execute_results(self, fn: Callable, *args: Any) -> AsyncIterator[Any]:
+        """Call ``fn`` and yield each item of its result, timed as ``execute``.
+
+        Only ``fn``'s own work counts: the call and each step of its
+        iteration. Time the caller spends between items, serialising them or
+        waiting on a slow client, is left out.
+        """
+
+        elapsed, started = 0.0, time.perf_counter()
+        try:
+            result = await self._call_fn(fn, *args)
+            async for item in self._iterate_result(result):
+                elapsed += time.perf_counter() - started
+                started = None
+                yield item
+                started = time.perf_counter()
+        finally:
+            if started is not None:
+                elapsed += time.perf_counter() - started
+            if self.metrics is not None:
+                self.metrics.phases.observe(elapsed, phase="execute")
+
+    def mount(self, app: Any, path: str) -> "Blocks":
+        """Serve this interface under ``path`` of an existing FastAPI or Starlette app.
+
+        The interface's executor starts and stops with ``app``, so mount
+        before ``app`` starts serving. Mount several interfaces into one app
+        to run them on one server; give them the same ``metrics`` registry
+        and ``executor`` to share those too. :class:`~chailab.hub.Hub` does
+        all of this in one call.
+        """
+
+        prefix = mount_prefix(path)
+        self._metric_labels = {"app": prefix}
+        sub_app = self._ensure_app()
+        app.mount(prefix, sub_app)
+        parent = app.router.lifespan_context
+
+        @contextlib.asynccontextmanager
+        async def lifespan(outer: Any) -> AsyncIterator[Any]:
+            async with parent(outer) as state:
+                async with self._lifespan(sub_app):
+                    yield state
+
+        app.router.lifespan_context = lifespan
+        return self
+
     def launch(
         self,
         host: str = "127.0.0.1",
@@ -67,6 +673,8 @@ class Blocks:
         block: bool | None = None,
         log_level: str = "info",
         share: bool = False,
+        workers: int = 1,
+        profile: bool | Profiler = False,
     ) -> "Blocks":
         """Launch the FastAPI application.
 
@@ -79,6 +687,13 @@ class Blocks:
                 not running in a notebook.
             log_level: Uvicorn log level.
             share: Placeholder argument for future public sharing support.
+            workers: Number of server processes. Values above 1 build the app
+                once and fork workers that share the listening socket and the
+                memory loaded before the fork; this mode always blocks.
+            profile: Enable on-demand profiling, with default settings when
+                ``True`` or a configured :class:`~chailab.profiling.Profiler`.
+                Requests opt in with an ``X-Chailab-Profile: 1`` header or a
+                ``?profile=1`` query; results are served under ``/debug/profiles``.
         """
 
         if share:  # pragma: no cover - share UX not yet implemented
@@ -88,19 +703,35 @@ class Blocks:
         block = (not inline) if block is None else block
         open_browser = (not inline) if open_browser is None else open_browser
 
+        if profile and self.profiler is None:
+            self.profiler = profile if isinstance(profile, Profiler) else Profiler()
+            if self.app is not None:
+                self._mount_profiling(self.app, self.profiler)
+
         app = self._ensure_app()
         url = f"http://{host}:{port}"
         self._last_launch_url = url
 
+        if workers > 1:
+            if inline or not block:
+                raise ValueError("workers > 1 is only supported for blocking launches.")
+            print(f"Starting ChaiLab server at {url} with {workers} workers")
+            if self.description:
+                print(self.description)
+            from .serving import serve_prefork
+
+            serve_prefork(app, host=host, port=port, workers=workers, log_level=log_level)
+            return self
+
         if block:
             print(f"Starting ChaiLab server at {url}")
             if self.description:
                 print(self.description)
-            uvicorn.run(app, host=host, port=port, log_level=log_level)
+            _web.uvicorn.run(app, host=host, port=port, log_level=log_level)
             return self
 
-        config = uvicorn.Config(app, host=host, port=port, log_level=log_level)
-        server = uvicorn.Server(config)
+        config = _web.uvicorn.Config(app, host=host, port=port, log_level=log_level)
+        server = _web.uvicorn.Server(config)
 
         thread = threading.Thread(target=server.run, name="ChaiLabServer", daemon=True)
         thread.start()
@@ -166,4 +797,4 @@ class Blocks:
         self.close()
 
 
-__all__ = ["Blocks"]
+__all__ = ["Blocks", "ClientDisconnected", "RequestError"]
@@ -0,0 +1,242 @@
+"""Memoization of deterministic ``Interface`` results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+Namespace = Union[str, Callable, None]
+
+_MISSING = object()
+
+
+def namespace_for(fn: Namespace) -> Optional[str]:
+    """Return the cache namespace for ``fn`` (its qualified name).
+
+    Lambdas and closures share a qualified name with their siblings, so
+    their namespace also carries the function object's id. Such entries
+    only live as long as the process.
+    """
+
+    if fn is None or isinstance(fn, str):
+        return fn
+    module = getattr(fn, "__module__", None) or ""
+    name = getattr(fn, "__qualname__", None)
+    if name is None:
+        return f"{module}.{type(fn).__qualname__}@{id(fn):x}"
+    if "<lambda>" in name or "<locals>" in name:
+        return f"{module}.{name}@{id(fn):x}"
+    return f"{module}.{name}"
+
+
+def _key_default(obj: Any) -> Any:
+    # Arrays and bytes are keyed by a digest of their raw contents; a repr
+    # would summarise large arrays and make different inputs collide.
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return ["\x00bytes", hashlib.sha256(obj).hexdigest()]
+    if hasattr(obj, "dtype") and hasattr(obj, "shape") and hasattr(obj, "tobytes"):
+        if obj.dtype.kind == "O":
+            raise TypeError("Object arrays have no stable cache key.")
+        return ["\x00array", obj.dtype.str, list(obj.shape), hashlib.sha256(obj.tobytes()).hexdigest()]
+    raise TypeError(f"Inputs of type {type(obj).__name__} have no stable cache key.")
+
+
+def canonical_key(namespace: str, inputs: Any) -> str:
+    """Hash ``inputs`` into a stable key; equal JSON values give equal keys.
+
+    NumPy arrays and bytes are keyed by their contents. Raises
+    :class:`TypeError` for any other value without a lossless encoding.
+    """
+
+    payload = json.dumps([namespace, inputs], sort_keys=True, separators=(",", ":"), default=_key_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """LRU result cache with optional TTL and an optional SQLite disk tier.
+
+    Args:
+        max_size: Maximum number of entries kept in memory.
+        ttl: Seconds an entry stays valid; ``None`` keeps entries until evicted.
+        disk_path: SQLite file for a second tier that survives restarts.
+            Memory misses fall back to it, and disk hits are promoted back
+            into memory. Results that cannot be pickled stay memory-only.
+            The file is opened on first use, once per process, so prefork
+            workers never share a connection.
+
+    One cache may be shared by several interfaces; entries are namespaced
+    by fn so :meth:`invalidate` can drop a single fn's results.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        *,
+        ttl: Optional[float] = None,
+        disk_path: Union[str, Path, None] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._entries: "OrderedDict[str, Tuple[str, Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_path = str(disk_path) if disk_path is not None else None
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Return this process's disk-tier connection, opening it on first use."""
+
+        if self._disk_path is None:
+            return None
+        # Connections must not cross a fork, so prefork workers reconnect.
+        if self._db is None or self._pid != os.getpid():
+            self._db = sqlite3.connect(self._disk_path, check_same_thread=False, isolation_level=None)
+            self._pid = os.getpid()
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value BLOB NOT NULL, expires REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_namespace ON results (namespace)")
+        return self._db
+
+    def key(self, fn: Namespace, inputs: Any) -> Optional[str]:
+        """Return the key for ``inputs``, or ``None`` if they cannot be cached."""
+
+        try:
+            return canonical_key(namespace_for(fn) or "", inputs)
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` on a miss."""
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                namespace, value, expires = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value, namespace, expires = self._disk_get(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.disk_hits += 1
+        # A promoted entry keeps the expiry it was stored with.
+        if expires is not None:
+            expires = now + (expires - time.time())
+        self._remember(key, namespace, value, expires)
+        return value
+
+    def set(self, key: str, value: Any, *, fn: Namespace = None) -> None:
+        namespace = namespace_for(fn) or ""
+        self._remember(key, namespace, value, time.monotonic() + self.ttl if self.ttl is not None else None)
+        self._disk_set(key, namespace, value)
+
+    def invalidate(self, fn: Namespace = None) -> None:
+        """Drop every entry, or only those produced by ``fn``."""
+
+        namespace = namespace_for(fn)
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for key in [k for k, entry in self._entries.items() if entry[0] == namespace]:
+                    del self._entries[key]
+            db = self._connect()
+            if db is not None:
+                if namespace is None:
+                    db.execute("DELETE FROM results")
+                else:
+                    db.execute("DELETE FROM results WHERE namespace = ?", (namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+    def close(self) -> None:
+        """Close the disk tier; the cache keeps working from memory."""
+
+        with self._lock:
+            self._disk_path = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+    def _remember(self, key: str, namespace: str, value: Any, expires: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (namespace, value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Tuple[Any, str, Optional[float]]:
+        """Return ``(value, namespace, expires)``; ``expires`` is wall-clock time."""
+
+        if self._disk_path is None:
+            return _MISSING, "", None
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return _MISSING, "", None
+            row = db.execute(
+                "SELECT namespace, value, expires FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISSING, "", None
+            namespace, blob, expires = row
+            if expires is not None and expires <= time.time():
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+                return _MISSING, "", None
+        return pickle.loads(blob), namespace, expires
+
+    def _disk_set(self, key: str, namespace: str, value: Any) -> None:
+        if self._disk_path is None:
+            return
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:  # unpicklable results stay memory-only
+            return
+        # Wall-clock expiry so entries remain meaningful across restarts.
+        expires = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, namespace, value, expires) VALUES (?, ?, ?, ?)",
+                (key, namespace, blob, expires),
+            )
+
+
+__all__ = ["ResultCache", "canonical_key"]
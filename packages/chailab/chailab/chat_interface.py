@@ -3,15 +3,24 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
 import inspect
-import json
-from typing import Any, Callable, Dict, List
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
 
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from . import _web
+from .blocks import Blocks, ClientDisconnected, Event, RequestError
+from .codec import Codec
+from .conversations import ConversationStore, MemoryConversationStore
+from .deltas import STREAM_MODES, DeltaEncoder
+from .executors import ExecutorSpec, FunctionExecutor
+from .metrics import Metrics
+from .queueing import QueueFullError
+from .sessions import ChatSession, SessionStore
+from .windowing import HistoryWindow, history_window
 
-from .blocks import Blocks
+_MAX_SESSION_ID_LENGTH = 128
+_MAX_PAGE_SIZE = 500
 
 
 class ChatInterface(Blocks):
@@ -25,84 +34,311 @@ class ChatInterface(Blocks):
         placeholder: str = "Send a message…",
         autofocus: bool = True,
         save_history: bool = False,
+        concurrency_limit: int | None = None,
+        max_queue_size: int | None = None,
+        executor: ExecutorSpec = None,
+        workers: int | None = None,
+        sessions: SessionStore | None = None,
+        store: bool | ConversationStore = False,
+        window: HistoryWindow | int | None = None,
+        stream_mode: str = "delta",
+        metrics: bool | Metrics = False,
+        codec: Codec | str | None = None,
     ) -> None:
-        super().__init__(title=title, description=description or "", theme=theme)
+        super().__init__(
+            title=title,
+            description=description or "",
+            theme=theme,
+            concurrency_limit=concurrency_limit,
+            max_queue_size=max_queue_size,
+            metrics=metrics,
+            codec=codec,
+        )
         self.fn = fn
+        self.executor = FunctionExecutor(fn, executor, workers)
         self.placeholder = placeholder
         self.autofocus = autofocus
         self.save_history = save_history
+        self.sessions = sessions if sessions is not None else SessionStore()
+        self.store: ConversationStore | None = MemoryConversationStore() if store is True else (store or None)
+        self.window = history_window(window) if window is not None else None
+        if stream_mode not in STREAM_MODES:
+            raise ValueError(f"Unknown stream mode {stream_mode!r}; expected one of {', '.join(STREAM_MODES)}.")
+        self.stream_mode = stream_mode
 
     # ------------------------------------------------------------------
     # FastAPI application
     # ------------------------------------------------------------------
     def _create_app(self):
-        app = FastAPI(title=self.title, description=self.description)
+        app = _web.FastAPI(title=self.title, description=self.description, lifespan=self._lifespan)
         app.add_middleware(
-            CORSMiddleware,
+            _web.CORSMiddleware,
             allow_origins=["*"],
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
         )
 
-        @app.get("/", response_class=HTMLResponse)
-        async def root():
-            return self._render_html()
+        self._mount_common_routes(app)
+        page = self._build_page()
+
+        @app.api_route("/", methods=["GET", "HEAD"])
+        async def root(request: _web.Request):
+            return page.respond(request)
 
         @app.post("/api/chat")
-        async def chat(request: Request):
-            payload = await request.json()
-            message = payload.get("message", "")
-            history = payload.get("history", [])
-            if not isinstance(history, list):
-                return JSONResponse({"success": False, "error": "History must be a list."}, status_code=400)
+        async def chat(request: _web.Request):
+            try:
+                message, history, session = self._resolve(await self._read_json(request))
+            except RequestError as exc:
+                return self._error_response(exc)
+
+            async def run():
+                async with self.queue.slot():
+                    return await self._execute(message, history, session)
 
             try:
-                response, updated_history = await self._execute(message, history)
+                response, updated_history = await self._unless_disconnected(request, run)
+            except ClientDisconnected:
+                return _web.Response(status_code=499)
+            except QueueFullError as exc:
+                return self._busy_response(exc)
             except Exception as exc:  # pragma: no cover
-                return JSONResponse({"success": False, "error": str(exc)}, status_code=500)
+                return _web.JSONResponse({"success": False, "error": str(exc)}, status_code=500)
+
+            if session is not None:
+                return self._json_response({"success": True, "message": response, "session_id": session.id})
+            return self._json_response(
+                {
+                    "success": True,
+                    "message": response,
+                    "history": updated_history,
+                }
+            )
+
+        @app.post("/api/chat/stream")
+        async def chat_stream(request: _web.Request):
+            try:
+                message, history, session = self._resolve(await self._read_json(request))
+            except RequestError as exc:
+                return self._error_response(exc)
 
-            return {
-                "success": True,
-                "message": response,
-                "history": updated_history,
-            }
+            try:
+                ticket = self.queue.enqueue()
+            except QueueFullError as exc:
+                return self._busy_response(exc)
+            return self._event_response(
+                self._queued_events(ticket, lambda: self._stream_events(message, history, session))
+            )
+
+        @app.get("/api/chat/session/{session_id}/messages")
+        async def session_messages(session_id: str, before: Optional[int] = None, limit: int = 50):
+            start, messages, total = self._page(session_id, before, max(1, min(limit, _MAX_PAGE_SIZE)))
+            return self._json_response({"success": True, "messages": messages, "start": start, "total": total})
+
+        @app.delete("/api/chat/session/{session_id}")
+        async def end_session(session_id: str):
+            self.sessions.discard(session_id)
+            if self.store is not None:
+                self.store.delete(session_id)
+            return {"success": True}
 
         return app
 
-    async def _execute(self, message: str, history: List[Dict[str, Any]]):
-        fn = self.fn
-        history_copy = [dict(item) for item in history]
+    def _resolve(self, payload: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]], Optional[ChatSession]]:
+        """Work out which history a request continues.
 
-        if inspect.iscoroutinefunction(fn):
-            result = await fn(message, history_copy)
-        else:
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = None
+        Requests with a ``session_id`` continue the server-held session and
+        only carry the new message. A session that is missing here, or
+        whose length differs from the client's ``turns``, is reloaded from
+        the conversation store if there is one; otherwise the client gets a
+        409 and may resend its ``history`` once to seed a fresh session.
+        Requests without a session id keep the stateless protocol and send
+        the full ``history``.
+        """
+
+        message = payload.get("message", "")
+        history = payload.get("history", [])
+        if not isinstance(history, list):
+            raise RequestError("History must be a list.")
+        if not all(isinstance(item, Mapping) for item in history):
+            raise RequestError("History items must be objects.")
+
+        session_id = payload.get("session_id")
+        if session_id is None:
+            return message, history, None
+        if not isinstance(session_id, str) or not 0 < len(session_id) <= _MAX_SESSION_ID_LENGTH:
+            raise RequestError("Invalid session id.")
+
+        turns = payload.get("turns")
+        if turns is not None and (not isinstance(turns, int) or isinstance(turns, bool) or turns < 0):
+            raise RequestError("Invalid turn count.")
+
+        session = self.sessions.get(session_id)
+        if "history" in payload:
+            history = [dict(item) for item in history]
+            session = self.sessions.create(session_id, history)
+            if self.store is not None:
+                self.store.delete(session_id)
+                self.store.append(session_id, history)
+        elif session is None or self._stale(session, turns):
+            # An evicted session, or one another worker has moved on, is
+            # reloaded from the store when there is one.
+            stored = self.store.load(session_id) if self.store is not None else []
+            if turns is not None and len(stored) != turns:
+                raise RequestError("Unknown or expired session.", status_code=409, session_expired=True)
+            session = self.sessions.create(session_id, stored)
+        return message, session.history, session
+
+    @staticmethod
+    def _stale(session: ChatSession, turns: Optional[int]) -> bool:
+        # The client counts the messages it has seen; a session that holds a
+        # different number is out of date in this process.
+        return turns is not None and turns != len(session.history)
+
+    async def _socket_events(self, payload: Dict[str, Any]) -> AsyncIterator[Event]:
+        """Answer a ``{"type": "chat", "message": ...}`` socket message."""
+
+        if payload.get("type") != "chat":
+            raise RequestError(f"Unsupported message type {payload.get('type')!r}.")
+        message, history, session = self._resolve(payload)
+        ticket = self.queue.enqueue()
+        async for event in self._queued_events(ticket, lambda: self._stream_events(message, history, session)):
+            yield event
+
+    async def _stream_events(
+        self,
+        message: str,
+        history: List[Dict[str, Any]],
+        session: Optional[ChatSession] = None,
+    ) -> AsyncIterator[Event]:
+        """Turn a streamed reply into events.
+
+        Each new piece of the reply is sent as ``{"type": "chunk", "content":
+        ...}``; when a cumulative yield rewrites earlier text the chunk also
+        carries ``offset``, the number of characters kept before appending.
+        The stream ends with a ``done`` event carrying the full message and
+        either the session id or the updated history, or an ``error`` event.
+        """
 
-            if loop and loop.is_running():
-                result = await loop.run_in_executor(None, lambda: fn(message, history_copy))
+        reply = DeltaEncoder(self.stream_mode)
+        async with self._turn(session):
+            try:
+                async for chunk in self._stream(message, await self._history_for(history, session)):
+                    delta = reply.push(chunk)
+                    if delta is None:
+                        continue
+                    offset, content = delta
+                    event: Dict[str, Any] = {"type": "chunk", "content": content}
+                    if offset is not None:
+                        event["offset"] = offset
+                    yield event
+            except asyncio.CancelledError:
+                # Stopped mid-reply: keep the partial reply the user already saw.
+                if session is not None:
+                    self._record_turn(session, message, reply.text)
+                raise
+            except Exception as exc:  # pragma: no cover - surface runtime error
+                yield {"type": "error", "error": str(exc)}
+                return
+
+            response_text = reply.text
+            done: Dict[str, Any] = {"type": "done", "message": response_text}
+            if session is not None:
+                self._record_turn(session, message, response_text)
+                done["session_id"] = session.id
             else:
-                result = fn(message, history_copy)
-
-        if inspect.isasyncgen(result):
-            chunks: List[str] = [chunk async for chunk in result]
-            response_text = "".join(map(str, chunks))
-        elif inspect.isgenerator(result):
-            chunks = list(result)
-            response_text = "".join(map(str, chunks))
-        else:
-            response_text = str(result) if result is not None else ""
-
-        updated_history = history_copy + [
+                done["history"] = self._extend_history(history, message, response_text)
+        yield done
+
+    async def _execute(
+        self,
+        message: str,
+        history: List[Dict[str, Any]],
+        session: Optional[ChatSession] = None,
+    ):
+        reply = DeltaEncoder(self.stream_mode)
+        async with self._turn(session):
+            async for chunk in self._stream(message, await self._history_for(history, session)):
+                reply.push(chunk)
+            response_text = reply.text
+            if session is not None:
+                self._record_turn(session, message, response_text)
+                return response_text, None
+            return response_text, self._extend_history(history, message, response_text)
+
+    async def _stream(self, message: str, history: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Yield response chunks as soon as ``fn`` produces them."""
+
+        async for chunk in self._execute_results(self.fn, message, history):
+            if chunk is None:
+                continue
+            yield str(chunk)
+
+    def _register_metrics(self, metrics: Metrics) -> None:
+        super()._register_metrics(metrics)
+        sessions, labels = self.sessions, self._metric_labels
+        metrics.callback("chailab_chat_sessions", "Live chat sessions.", lambda: len(sessions), **labels)
+        metrics.callback(
+            "chailab_chat_session_bytes",
+            "Approximate memory held by chat sessions.",
+            lambda: sessions.stats()["bytes"],
+            **labels,
+        )
+
+    @staticmethod
+    def _turn(session: Optional[ChatSession]):
+        """Serialise turns within one session; stateless requests run freely."""
+
+        return session.lock if session is not None else contextlib.nullcontext()
+
+    async def _history_for(self, history: List[Dict[str, Any]], session: Optional[ChatSession]) -> List[Dict[str, Any]]:
+        """Return the part of the conversation fn sees this turn."""
+
+        if self.window is None:
+            # fn gets copies, so changing a message cannot corrupt the session.
+            source = session.history if session is not None else history
+            return [dict(item) for item in source]
+        with self._phase("window"):
+            if session is None:
+                return await self.window.view(self.window.new_state(), history, self._call_hook)
+            if session.window is None:
+                session.window = self.window.new_state()
+            return await self.window.view(session.window, session.history, self._call_hook)
+
+    async def _call_hook(self, hook: Callable, *args: Any) -> Any:
+        """Run a windowing hook, such as a summarizer, off the event loop."""
+
+        if inspect.iscoroutinefunction(hook):
+            return await hook(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor.thread_pool, functools.partial(hook, *args))
+
+    def _record_turn(self, session: ChatSession, message: str, response_text: str) -> None:
+        turn = [{"role": "user", "content": message}, {"role": "assistant", "content": response_text}]
+        self.sessions.record(session, *turn)
+        if self.store is not None:
+            self.store.append(session.id, turn)
+
+    def _page(self, session_id: str, before: Optional[int], limit: int) -> Tuple[int, List[Dict[str, Any]], int]:
+        """Return ``(start, messages, total)`` for one page of a conversation."""
+
+        if self.store is not None:
+            start, messages = self.store.page(session_id, before=before, limit=limit)
+            return start, messages, self.store.count(session_id)
+        session = self.sessions.get(session_id)
+        history = session.history if session is not None else []
+        end = len(history) if before is None else max(0, min(before, len(history)))
+        start = max(0, end - limit)
+        return start, history[start:end], len(history)
+
+    @staticmethod
+    def _extend_history(history: List[Dict[str, Any]], message: str, response_text: str) -> List[Dict[str, Any]]:
+        return [dict(item) for item in history] + [
             {"role": "user", "content": message},
             {"role": "assistant", "content": response_text},
         ]
 
-        return response_text, updated_history
-
     # ------------------------------------------------------------------
     # Rendering helpers
     # ------------------------------------------------------------------
@@ -113,258 +349,9 @@ class ChatInterface(Blocks):
             "placeholder": self.placeholder,
             "autofocus": self.autofocus,
             "save_history": self.save_history,
+            "store": self.store is not None,
         }
-        config_json = json.dumps(config)
-
-        return f"""
-        <!DOCTYPE html>
-        <html lang=\"en\">
-        <head>
-            <meta charset=\"UTF-8\" />
-            <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />
-            <title>{self.title}</title>
-            <script src=\"https://cdn.tailwindcss.com\"></script>
-            <script>
-                tailwind.config = {{
-                    theme: {{
-                        extend: {{
-                            colors: {{
-                                border: 'hsl(var(--border))',
-                                input: 'hsl(var(--input))',
-                                ring: 'hsl(var(--ring))',
-                                background: 'hsl(var(--background))',
-                                foreground: 'hsl(var(--foreground))',
-                                primary: {{
-                                    DEFAULT: 'hsl(var(--primary))',
-                                    foreground: 'hsl(var(--primary-foreground))'
-                                }},
-                                secondary: {{
-                                    DEFAULT: 'hsl(var(--secondary))',
-                                    foreground: 'hsl(var(--secondary-foreground))'
-                                }},
-                                destructive: {{
-                                    DEFAULT: 'hsl(var(--destructive))',
-                                    foreground: 'hsl(var(--destructive-foreground))'
-                                }},
-                                muted: {{
-                                    DEFAULT: 'hsl(var(--muted))',
-                                    foreground: 'hsl(var(--muted-foreground))'
-                                }},
-                                accent: {{
-                                    DEFAULT: 'hsl(var(--accent))',
-                                    foreground: 'hsl(var(--accent-foreground))'
-                                }},
-                                card: {{
-                                    DEFAULT: 'hsl(var(--card))',
-                                    foreground: 'hsl(var(--card-foreground))'
-                                }}
-                            }},
-                            borderRadius: {{
-                                lg: 'var(--radius)',
-                                md: 'calc(var(--radius) - 2px)',
-                                sm: 'calc(var(--radius) - 4px)'
-                            }}
-                        }}
-                    }}
-                }}
-            </script>
-            <script src=\"https://unpkg.com/react@18/umd/react.development.js\"></script>
-            <script src=\"https://unpkg.com/react-dom@18/umd/react-dom.development.js\"></script>
-            <script src=\"https://unpkg.com/@babel/standalone/babel.min.js\"></script>
-            <style>
-                :root {{
-                    --background: 0 0% 100%;
-                    --foreground: 222.2 84% 4.9%;
-                    --card: 0 0% 100%;
-                    --card-foreground: 222.2 84% 4.9%;
-                    --popover: 0 0% 100%;
-                    --popover-foreground: 222.2 84% 4.9%;
-                    --primary: 222.2 47.4% 11.2%;
-                    --primary-foreground: 210 40% 98%;
-                    --secondary: 210 40% 96%;
-                    --secondary-foreground: 222.2 47.4% 11.2%;
-                    --muted: 210 40% 96%;
-                    --muted-foreground: 215.4 16.3% 46.9%;
-                    --accent: 210 40% 96%;
-                    --accent-foreground: 222.2 47.4% 11.2%;
-                    --destructive: 0 84.2% 60.2%;
-                    --destructive-foreground: 210 40% 98%;
-                    --border: 214.3 31.8% 91.4%;
-                    --input: 214.3 31.8% 91.4%;
-                    --ring: 222.2 84% 4.9%;
-                    --radius: 0.5rem;
-                }}
-            </style>
-        </head>
-        <body class=\"min-h-screen bg-background py-6\">
-            <div id=\"app\" class=\"container mx-auto max-w-3xl px-4\"></div>
-            <script type=\"text/babel\">
-                const chatConfig = {config_json};
-
-                const HISTORY_KEY = 'chailab_chat_history';
-
-                function loadHistory() {{
-                    if (!chatConfig.save_history) return [];
-                    try {{
-                        const raw = window.localStorage.getItem(HISTORY_KEY);
-                        if (!raw) return [];
-                        const parsed = JSON.parse(raw);
-                        return Array.isArray(parsed) ? parsed : [];
-                    }} catch (err) {{
-                        console.warn('Failed to load chat history:', err);
-                        return [];
-                    }}
-                }}
-
-                function persistHistory(history) {{
-                    if (!chatConfig.save_history) return;
-                    try {{
-                        window.localStorage.setItem(HISTORY_KEY, JSON.stringify(history));
-                    }} catch (err) {{
-                        console.warn('Failed to persist chat history:', err);
-                    }}
-                }}
-
-                function ChatMessage({{ entry }}) {{
-                    const isUser = entry.role === 'user';
-                    const alignment = isUser ? 'justify-end' : 'justify-start';
-                    const bubble = isUser
-                        ? 'bg-primary text-primary-foreground'
-                        : 'bg-secondary text-secondary-foreground';
-                    return (
-                        <div className={{"flex " + alignment}}>
-                            <div className={{"max-w-[80%] rounded-lg px-3 py-2 text-sm shadow-sm " + bubble}}>
-                                {{entry.content}}
-                            </div>
-                        </div>
-                    );
-                }}
-
-                function App() {{
-                    const [history, setHistory] = React.useState(() => loadHistory());
-                    const [message, setMessage] = React.useState('');
-                    const [isLoading, setIsLoading] = React.useState(false);
-                    const [error, setError] = React.useState(null);
-                    const containerRef = React.useRef(null);
-
-                    React.useEffect(() => {{
-                        if (!containerRef.current) return;
-                        containerRef.current.scrollTop = containerRef.current.scrollHeight;
-                    }}, [history, isLoading]);
-
-                    const sendMessage = async () => {{
-                        if (!message.trim()) return;
-                        const nextHistory = [...history, {{ role: 'user', content: message }}];
-                        setHistory(nextHistory);
-                        persistHistory(nextHistory);
-                        setMessage('');
-                        setIsLoading(true);
-                        setError(null);
-
-                        try {{
-                            const response = await fetch('/api/chat', {{
-                                method: 'POST',
-                                headers: {{ 'Content-Type': 'application/json' }},
-                                body: JSON.stringify({{
-                                    message,
-                                    history,
-                                }}),
-                            }});
-                            const data = await response.json();
-                            if (data.success) {{
-                                setHistory(data.history);
-                                persistHistory(data.history);
-                            }} else {{
-                                setError(data.error || 'Unknown error');
-                            }}
-                        }} catch (err) {{
-                            setError(err.message);
-                        }} finally {{
-                            setIsLoading(false);
-                        }}
-                    }};
-
-                    const handleSubmit = (event) => {{
-                        event.preventDefault();
-                        sendMessage();
-                    }};
-
-                    const handleClear = () => {{
-                        setHistory([]);
-                        persistHistory([]);
-                    }};
-
-                    return (
-                        <div className=\"space-y-4\">
-                            <div className=\"rounded-lg border bg-card text-card-foreground shadow-sm\">
-                                <div className=\"border-b px-6 py-4\">
-                                    <div className=\"flex items-start justify-between\">
-                                        <div>
-                                            <h1 className=\"text-2xl font-semibold\">{{chatConfig.title}}</h1>
-                                            {{chatConfig.description ? (
-                                                <p className=\"text-sm text-muted-foreground\">{{chatConfig.description}}</p>
-                                            ) : null}}
-                                        </div>
-                                        <button
-                                            type=\"button\"
-                                            onClick={{handleClear}}
-                                            className=\"text-sm text-muted-foreground hover:text-foreground\"
-                                        >
-                                            Clear
-                                        </button>
-                                    </div>
-                                </div>
-                                <div ref={{containerRef}} className=\"flex h-[420px] flex-col gap-3 overflow-y-auto bg-muted/40 px-6 py-4\">
-                                    {{history.length === 0 && !isLoading ? (
-                                        <div className=\"flex h-full items-center justify-center text-sm text-muted-foreground\">
-                                            Start the conversation by sending a message.
-                                        </div>
-                                    ) : (
-                                        history.map((entry, index) => <ChatMessage key={{index}} entry={{entry}} />)
-                                    )}}
-                                    {{isLoading ? (
-                                        <div className=\"flex justify-start\">
-                                            <div className=\"flex items-center gap-1 rounded-lg bg-secondary px-3 py-2 text-sm text-secondary-foreground\">
-                                                <span className=\"size-2 animate-bounce rounded-full bg-secondary-foreground\"></span>
-                                                <span className=\"size-2 animate-bounce rounded-full bg-secondary-foreground [animation-delay:150ms]\"></span>
-                                                <span className=\"size-2 animate-bounce rounded-full bg-secondary-foreground [animation-delay:300ms]\"></span>
-                                            </div>
-                                        </div>
-                                    ) : null}}
-                                </div>
-                                <form onSubmit={{handleSubmit}} className=\"border-t bg-card px-6 py-4\">
-                                    <div className=\"flex items-center gap-2\">
-                                        <textarea
-                                            value={{message}}
-                                            onChange={{(event) => setMessage(event.target.value)}}
-                                            placeholder={{chatConfig.placeholder}}
-                                            autoFocus={{chatConfig.autofocus}}
-                                            rows={{1}}
-                                            className=\"flex-grow resize-none rounded-md border border-input bg-background px-3 py-2 text-sm shadow-sm focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2\"
-                                        />
-                                        <button
-                                            type=\"submit\"
-                                            disabled={{isLoading || !message.trim()}}
-                                            className=\"inline-flex items-center justify-center whitespace-nowrap rounded-md bg-primary px-4 py-2 text-sm font-medium text-primary-foreground transition-colors hover:bg-primary/90 focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50\"
-                                        >
-                                            Send
-                                        </button>
-                                    </div>
-                                    {{error ? (
-                                        <p className=\"mt-2 text-sm text-destructive\">{{error}}</p>
-                                    ) : null}}
-                                </form>
-                            </div>
-                        </div>
-                    );
-                }}
-
-                const root = ReactDOM.createRoot(document.getElementById('app'));
-                root.render(<App />);
-            </script>
-        </body>
-        </html>
-        """
+        return self._render_shell(config, entry="chat.js", container_class="container mx-auto max-w-3xl px-4")
 
 
 __all__ = ["ChatInterface"]
@@ -0,0 +1,123 @@
+"""Command-line entry point: ``chailab serve module:demo``."""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from typing import List, Optional
+
+from .blocks import Blocks
+
+
+def load_app(target: str) -> Blocks:
+    """Import ``module:attribute`` (attribute defaults to ``demo``)."""
+
+    module_name, _, attribute = target.partition(":")
+    attribute = attribute or "demo"
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    try:
+        app = getattr(module, attribute)
+    except AttributeError:
+        raise SystemExit(f"Module '{module_name}' has no attribute '{attribute}'.") from None
+    if not isinstance(app, Blocks):
+        raise SystemExit(f"'{target}' is not a ChaiLab Interface or ChatInterface.")
+    return app
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="chailab", description="ChaiLab command-line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Serve a ChaiLab app, optionally with several workers.")
+    serve.add_argument("target", help="App to serve, as module:attribute (default attribute: demo).")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=7860)
+    serve.add_argument("--workers", type=int, default=1, help="Number of forked server processes.")
+    serve.add_argument("--log-level", default="info")
+    serve.add_argument(
+        "--profile",
+        action="store_true",
+        help="Allow requests to opt into profiling; results are served under /debug/profiles.",
+    )
+
+    bench = commands.add_parser("bench", help="Measure throughput and latency of a ChaiLab app.")
+    bench.add_argument("target", nargs="?", help="App to benchmark in-process, as module:attribute.")
+    bench.add_argument("--url", help="Benchmark a running server at this base URL instead.")
+    bench.add_argument("--socket", action="store_true", help="Serve the app on a local port and use HTTP.")
+    bench.add_argument("--concurrency", type=int, default=8)
+    bench.add_argument("--requests", type=int, default=200)
+    bench.add_argument("--duration", type=float, help="Run for this many seconds instead of --requests.")
+    bench.add_argument("--warmup", type=int, default=0)
+    bench.add_argument(
+        "--path",
+        action="append",
+        metavar="PATH[:WEIGHT]",
+        help="Endpoint to include in the mix (repeatable); uses --payload as the body.",
+    )
+    bench.add_argument("--payload", help="JSON request body for every --path.")
+    bench.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline.")
+    bench.add_argument("--compare", metavar="FILE", help="Compare against a saved baseline.")
+    bench.add_argument("--tolerance", type=float, default=0.1, help="Allowed relative regression (default 0.1).")
+    return parser
+
+
+def _bench(args: argparse.Namespace) -> int:
+    from .bench import BenchResult, Scenario, format_comparison, run
+
+    if (args.target is None) == (args.url is None):
+        raise SystemExit("Pass either an app target or --url.")
+    target = args.url or load_app(args.target)
+    scenarios = None
+    if args.path:
+        if args.payload is None:
+            raise SystemExit("--path requires --payload.")
+        payload = json.loads(args.payload)
+        scenarios = []
+        for spec in args.path:
+            path, _, weight = spec.partition(":")
+            scenarios.append(Scenario(path, payload, float(weight or 1)))
+    result = run(
+        target,
+        scenarios,
+        concurrency=args.concurrency,
+        requests=args.requests,
+        duration=args.duration,
+        warmup=args.warmup,
+        socket=args.socket,
+    )
+    print(result.report())
+    if args.save:
+        result.save(args.save)
+    if args.compare:
+        rows = result.compare(BenchResult.load(args.compare), tolerance=args.tolerance)
+        print(format_comparison(rows))
+        if any(row["regression"] for row in rows):
+            return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _build_parser().parse_args(argv)
+    if args.command == "serve":
+        app = load_app(args.target)
+        app.launch(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level,
+            profile=args.profile,
+            inline=False,
+            open_browser=False,
+            block=True,
+        )
+    elif args.command == "bench":
+        sys.exit(_bench(args))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
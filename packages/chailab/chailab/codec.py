@@ -0,0 +1,137 @@
+"""JSON encoding and decoding for request and response bodies."""
+
+from __future__ import annotations
+
+import base64
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import math
+import uuid
+from pathlib import PurePath
+from typing import Any, Callable, Dict, Optional, Union
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - orjson unavailable
+    orjson = None
+
+
+def default(obj: Any) -> Any:
+    """Convert values the JSON encoders do not handle natively.
+
+    NumPy arrays and scalars are recognised by duck typing, so NumPy is
+    never imported here.
+    """
+
+    if hasattr(obj, "tolist") and hasattr(obj, "dtype"):  # numpy arrays and scalars
+        return obj.tolist()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (uuid.UUID, PurePath, decimal.Decimal)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode("ascii")
+    if hasattr(obj, "model_dump"):  # pydantic v2 models
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(obj: Any) -> Any:
+    """Replace NaN and infinities with ``None``, as orjson does."""
+
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(item) for item in obj]
+    return obj
+
+
+def _finite_default(obj: Any) -> Any:
+    return _finite(default(obj))
+
+
+class Codec:
+    """Encodes values to JSON bytes and decodes JSON text or bytes.
+
+    Non-finite floats are written as ``null``: ``NaN`` and ``Infinity`` are
+    not JSON, and browsers cannot parse them.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        options = {"ensure_ascii": False, "separators": (",", ":"), "allow_nan": False}
+        try:
+            text = json.dumps(obj, default=default, **options)
+        except ValueError as exc:
+            if "Out of range float" not in str(exc):
+                raise
+            # Only payloads holding NaN or infinities pay for the rewrite.
+            text = json.dumps(_finite(obj), default=_finite_default, **options)
+        return text.encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """:class:`Codec` backed by ``orjson``.
+
+    orjson serialises dataclasses, datetimes and NumPy arrays natively, much
+    faster than the standard library, and falls back to :func:`default`
+    for everything else. Values orjson rejects outright, such as integers
+    wider than 64 bits or namedtuples, are encoded by the standard library
+    instead.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise RuntimeError("OrjsonCodec requires orjson: pip install orjson")
+        self._options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=default, option=self._options)
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+_CODECS: Dict[str, Callable[[], Codec]] = {"json": Codec, "orjson": OrjsonCodec}
+
+
+def get_codec(spec: Union[Codec, str, None] = None) -> Codec:
+    """Resolve ``spec`` to a codec instance.
+
+    ``None`` picks orjson when it is installed and the standard library
+    otherwise; ``"json"`` or ``"orjson"`` force one of them.
+    """
+
+    if isinstance(spec, Codec):
+        return spec
+    if spec is None:
+        spec = "orjson" if orjson is not None else "json"
+    factory: Optional[Callable[[], Codec]] = _CODECS.get(spec)
+    if factory is None:
+        raise ValueError(f"Unknown codec {spec!r}; expected one of {', '.join(_CODECS)}.")
+    return factory()
+
+
+__all__ = ["Codec", "OrjsonCodec", "default", "get_codec"]
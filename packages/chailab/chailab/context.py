@@ -0,0 +1,90 @@
+"""Per-request context visible to user functions."""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+from typing import Any, Callable, Dict, Optional
+
+Reporter = Callable[[Dict[str, Any]], None]
+
+
+class CancellationToken:
+    """Set once the client that started a request no longer wants its result."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or ``timeout`` elapses; return whether cancelled."""
+
+        return self._event.wait(timeout)
+
+
+_reporter: contextvars.ContextVar[Optional[Reporter]] = contextvars.ContextVar("chailab_reporter", default=None)
+_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar("chailab_token", default=None)
+
+
+def progress(value: float, *, total: Optional[float] = None, desc: Optional[str] = None) -> None:
+    """Report progress of the current request to the browser.
+
+    ``value`` is a fraction between 0 and 1, or a count out of ``total``.
+    Call from inside an interface fn, including sync fns running in a worker
+    thread, e.g. ``chailab.progress(i, total=len(items), desc="Embedding")``.
+    Outside a streamed request, or in a process-pool worker, this is a no-op.
+    """
+
+    report = _reporter.get()
+    if report is None:
+        return
+    event: Dict[str, Any] = {"type": "progress", "progress": value}
+    if total is not None:
+        event["total"] = total
+    if desc is not None:
+        event["desc"] = desc
+    report(event)
+
+
+def cancellation_token() -> CancellationToken:
+    """Return the current request's cancellation token.
+
+    Long-running sync fns cannot be interrupted from the event loop, so they
+    should check ``token.cancelled`` between steps and return early once the
+    client has disconnected or pressed stop. Outside a request, or in a
+    process-pool worker, the token is never cancelled.
+    """
+
+    return _token.get() or CancellationToken()
+
+
+def is_cancelled() -> bool:
+    """Shorthand for ``cancellation_token().cancelled``."""
+
+    token = _token.get()
+    return token is not None and token.cancelled
+
+
+def bind_reporter(report: Optional[Reporter]) -> contextvars.Token:
+    return _reporter.set(report)
+
+
+def unbind_reporter(token: contextvars.Token) -> None:
+    _reporter.reset(token)
+
+
+def bind_token(token: Optional[CancellationToken]) -> contextvars.Token:
+    return _token.set(token)
+
+
+def unbind_token(token: contextvars.Token) -> None:
+    _token.reset(token)
+
+
+__all__ = ["CancellationToken", "cancellation_token", "is_cancelled", "progress"]
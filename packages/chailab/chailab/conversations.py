@@ -0,0 +1,162 @@
+"""Durable chat conversation stores with paginated reads."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+Message = Dict[str, Any]
+# ``(start, messages)``: the index of the first returned message and the messages.
+Page = Tuple[int, List[Message]]
+
+
+class ConversationStore:
+    """Append-only message log per conversation.
+
+    Each turn appends its messages; nothing is rewritten. Readers fetch
+    pages of messages counted from the end, so opening a long conversation
+    only reads its newest page. Subclasses implement :meth:`append`,
+    :meth:`count`, :meth:`page` and :meth:`delete`.
+    """
+
+    def append(self, conversation_id: str, messages: List[Message]) -> None:
+        raise NotImplementedError
+
+    def count(self, conversation_id: str) -> int:
+        raise NotImplementedError
+
+    def page(self, conversation_id: str, *, before: Optional[int] = None, limit: int = 50) -> Page:
+        """Return up to ``limit`` messages ending just before index ``before``.
+
+        ``before`` defaults to the end of the conversation.
+        """
+
+        raise NotImplementedError
+
+    def load(self, conversation_id: str) -> List[Message]:
+        """Return the whole conversation."""
+
+        return self.page(conversation_id, limit=self.count(conversation_id))[1]
+
+    def delete(self, conversation_id: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def _bounds(total: int, before: Optional[int], limit: int) -> Tuple[int, int]:
+    end = total if before is None else max(0, min(before, total))
+    return max(0, end - max(0, limit)), end
+
+
+class MemoryConversationStore(ConversationStore):
+    """Conversations kept in process memory.
+
+    They outlive evicted sessions but not the server process.
+    """
+
+    def __init__(self) -> None:
+        self._conversations: Dict[str, List[Message]] = {}
+        self._lock = threading.Lock()
+
+    def append(self, conversation_id: str, messages: List[Message]) -> None:
+        with self._lock:
+            self._conversations.setdefault(conversation_id, []).extend(dict(message) for message in messages)
+
+    def count(self, conversation_id: str) -> int:
+        with self._lock:
+            return len(self._conversations.get(conversation_id, ()))
+
+    def page(self, conversation_id: str, *, before: Optional[int] = None, limit: int = 50) -> Page:
+        with self._lock:
+            messages = self._conversations.get(conversation_id, [])
+            start, end = _bounds(len(messages), before, limit)
+            return start, [dict(message) for message in messages[start:end]]
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Conversations in an SQLite file, one row per message.
+
+    Rows are keyed by ``(conversation, seq)``, so a turn is a single
+    insert and a page is a range scan of the primary key. The file may be
+    shared by several worker processes; each opens its own connection.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so prefork workers reconnect.
+        if self._db is None or self._pid != os.getpid():
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._pid = os.getpid()
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "conversation TEXT NOT NULL, seq INTEGER NOT NULL, message TEXT NOT NULL, "
+                "PRIMARY KEY (conversation, seq)) WITHOUT ROWID"
+            )
+        return self._db
+
+    def append(self, conversation_id: str, messages: List[Message]) -> None:
+        rows = [json.dumps(message, ensure_ascii=False, default=repr) for message in messages]
+        if not rows:
+            return
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                (first,) = db.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation = ?", (conversation_id,)
+                ).fetchone()
+                db.executemany(
+                    "INSERT INTO messages (conversation, seq, message) VALUES (?, ?, ?)",
+                    [(conversation_id, first + index, row) for index, row in enumerate(rows)],
+                )
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def count(self, conversation_id: str) -> int:
+        with self._lock:
+            (total,) = self._connect().execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation = ?", (conversation_id,)
+            ).fetchone()
+        return total
+
+    def page(self, conversation_id: str, *, before: Optional[int] = None, limit: int = 50) -> Page:
+        start, end = _bounds(self.count(conversation_id), before, limit)
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT message FROM messages WHERE conversation = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (conversation_id, start, end),
+            ).fetchall()
+        return start, [json.loads(row) for (row,) in rows]
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM messages WHERE conversation = ?", (conversation_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+__all__ = ["ConversationStore", "MemoryConversationStore", "Page", "SQLiteConversationStore"]
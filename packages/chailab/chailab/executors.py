@@ -0,0 +1,148 @@
+"""Executors that run synchronous user functions off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import pickle
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, Union
+
+from .profiling import run_profiled
+
+ExecutorSpec = Union[str, Executor, None]
+
+_KINDS = ("thread", "process")
+
+# Set in process-pool workers by ``_install`` so each call only ships its args.
+_worker_fn: Optional[Callable] = None
+
+
+def _install(fn: Callable) -> None:
+    global _worker_fn
+    _worker_fn = fn
+
+
+def _call_installed(args: Tuple[Any, ...]) -> Any:
+    return _worker_fn(*args)
+
+
+def _call(fn: Callable, args: Tuple[Any, ...]) -> Any:
+    return fn(*args)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class FunctionExecutor:
+    """Run a user fn on the loop's default pool or a dedicated one.
+
+    ``kind`` is ``None`` (the event loop's default thread pool), ``"thread"``
+    (a dedicated :class:`ThreadPoolExecutor`), ``"process"`` (a
+    :class:`ProcessPoolExecutor` for CPU-bound, GIL-holding fns) or an
+    existing :class:`concurrent.futures.Executor`, which is used as-is and
+    never shut down by chailab.
+
+    Pools are created lazily, so an executor can be configured before the
+    server forks its workers.
+    """
+
+    def __init__(self, fn: Callable, kind: ExecutorSpec = None, workers: Optional[int] = None) -> None:
+        if isinstance(kind, str) and kind not in _KINDS:
+            raise ValueError(f"Unknown executor {kind!r}; expected one of {', '.join(_KINDS)}.")
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if kind == "process":
+            if inspect.isgeneratorfunction(fn) or inspect.isasyncgenfunction(fn):
+                raise ValueError("Generator functions cannot run in a process pool.")
+            try:
+                pickle.dumps(fn)
+            except Exception as exc:
+                raise ValueError(
+                    "The process executor needs a picklable, module-level function."
+                ) from exc
+        self.fn = fn
+        self.kind = kind
+        self.workers = workers
+        self._pool: Optional[Executor] = kind if isinstance(kind, Executor) else None
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def is_process(self) -> bool:
+        return self.kind == "process" or isinstance(self._pool, ProcessPoolExecutor)
+
+    @property
+    def pool(self) -> Optional[Executor]:
+        """The underlying pool, or ``None`` for the loop's default executor."""
+
+        if self._pool is None and self.kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chailab")
+        elif self._pool is None and self.kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_install,
+                initargs=(self.fn,),
+            )
+        return self._pool
+
+    @property
+    def capacity(self) -> int:
+        """Number of calls the pool can run at once."""
+
+        pool_workers = getattr(self._pool, "_max_workers", None)
+        if pool_workers:
+            return pool_workers
+        if self.workers:
+            return self.workers
+        cpus = os.cpu_count() or 1
+        return cpus if self.kind == "process" else min(32, cpus + 4)
+
+    @property
+    def thread_pool(self) -> Optional[Executor]:
+        """Pool for work that must stay in this process, such as driving generators."""
+
+        return None if self.is_process else self.pool
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await self._submit(fn, args)
+        finally:
+            self.in_flight -= 1
+            self.busy_seconds += time.perf_counter() - start
+
+    async def _submit(self, fn: Callable, args: Tuple[Any, ...]) -> Any:
+        loop = asyncio.get_running_loop()
+        if self.kind == "process" and fn is self.fn:
+            return await loop.run_in_executor(self.pool, _call_installed, args)
+        if self.is_process:
+            return await loop.run_in_executor(self.pool, _call, fn, args)
+        # Threads see the caller's context, e.g. the request's progress reporter.
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self.pool, functools.partial(ctx.run, run_profiled, fn, *args))
+
+    async def warm_up(self) -> None:
+        """Start every process-pool worker now rather than on the first request."""
+
+        if self.kind != "process":
+            return
+        loop = asyncio.get_running_loop()
+        count = self.workers or os.cpu_count() or 1
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ready) for _ in range(count)))
+
+    def shutdown(self) -> None:
+        """Release a pool chailab created; user-supplied executors are left running."""
+
+        if self._pool is not None and isinstance(self.kind, str):
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+__all__ = ["ExecutorSpec", "FunctionExecutor"]
@@ -0,0 +1,186 @@
+"""Binary frames carrying NumPy arrays next to a JSON document.
+
+A frame is::
+
+    b"CLF1" | uint32 header length | header JSON | padding | buffer | padding | buffer ...
+
+All integers are little-endian and every buffer starts at a multiple of 8
+bytes from the start of the frame, so readers can view it as a typed array
+without copying. The header is ``{"body": ..., "buffers": [[offset, nbytes], ...]}``
+where ``body`` is the original value with each array replaced by
+``{"__array__": index, "dtype": "float32", "shape": [...]}``. Arrays of
+other dtypes, such as strings or objects, stay JSON lists.
+
+An HTTP stream of frames prefixes each frame with its uint32 length.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from .codec import Codec
+
+MEDIA_TYPE = "application/x-chailab-frame"
+STREAM_MEDIA_TYPE = "application/x-chailab-frames"
+MAGIC = b"CLF1"
+ALIGN = 8
+
+# dtypes with a JavaScript typed array counterpart.
+DTYPES = (
+    "bool",
+    "int8",
+    "uint8",
+    "int16",
+    "uint16",
+    "int32",
+    "uint32",
+    "int64",
+    "uint64",
+    "float32",
+    "float64",
+)
+_HEAD = struct.Struct("<4sI")
+_LENGTH = struct.Struct("<I")
+
+
+class FrameError(ValueError):
+    """Raised for malformed frames."""
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGN
+
+
+def _is_array(value: Any) -> bool:
+    return hasattr(value, "__array_interface__") and getattr(value, "ndim", 0) > 0
+
+
+def accepts(header: Optional[str], media_type: str) -> bool:
+    """Whether an ``Accept`` header prefers ``media_type`` over JSON.
+
+    Frames must be asked for by name; ``*/*`` keeps the JSON default.
+    """
+
+    qualities: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        token, *params = (item.strip() for item in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token:
+            qualities[token.lower()] = quality
+    wanted = qualities.get(media_type, 0.0)
+    return wanted > 0 and wanted >= qualities.get("application/json", 0.0)
+
+
+def encode(value: Any, codec: Codec) -> bytes:
+    """Encode ``value`` as one frame, moving its NumPy arrays into raw buffers."""
+
+    buffers: List[memoryview] = []
+    body = _extract(value, buffers)
+    offsets: List[Tuple[int, int]] = []
+    position = 0
+    for buffer in buffers:
+        offsets.append((position, buffer.nbytes))
+        position += buffer.nbytes + _padding(buffer.nbytes)
+    header = codec.dumps({"body": body, "buffers": offsets})
+    start = _HEAD.size + len(header)
+    parts: List[Any] = [_HEAD.pack(MAGIC, len(header)), header, bytes(_padding(start))]
+    for buffer in buffers:
+        parts.append(buffer)
+        parts.append(bytes(_padding(buffer.nbytes)))
+    return b"".join(parts)
+
+
+def encode_stream_item(value: Any, codec: Codec) -> bytes:
+    """A frame with its length prefix, for :data:`STREAM_MEDIA_TYPE` responses."""
+
+    frame = encode(value, codec)
+    return _LENGTH.pack(len(frame)) + frame
+
+
+def decode(data: bytes, codec: Codec) -> Any:
+    """Decode a frame, restoring its arrays as writable NumPy arrays."""
+
+    if len(data) < _HEAD.size:
+        raise FrameError("Frame is truncated.")
+    magic, length = _HEAD.unpack_from(data)
+    if magic != MAGIC:
+        raise FrameError("Not a ChaiLab frame.")
+    start = _HEAD.size + length
+    if start > len(data):
+        raise FrameError("Frame is truncated.")
+    try:
+        header = codec.loads(data[_HEAD.size : start])
+    except ValueError:
+        raise FrameError("Frame header is malformed.") from None
+    if not isinstance(header, dict) or not isinstance(header.get("buffers"), list):
+        raise FrameError("Frame header is malformed.")
+    payload = bytearray(memoryview(data)[start + _padding(start) :])
+    buffers = []
+    for entry in header["buffers"]:
+        try:
+            offset, nbytes = (int(number) for number in entry)
+        except (TypeError, ValueError):
+            raise FrameError("Frame header is malformed.") from None
+        if offset < 0 or nbytes < 0 or offset + nbytes > len(payload):
+            raise FrameError("Frame buffer is out of range.")
+        buffers.append((offset, nbytes))
+    return _restore(header.get("body"), payload, buffers)
+
+
+def _extract(value: Any, buffers: List[memoryview]) -> Any:
+    if isinstance(value, dict):
+        return {key: _extract(item, buffers) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_extract(item, buffers) for item in value]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _extract(getattr(value, f.name), buffers) for f in dataclasses.fields(value)}
+    if _is_array(value) and value.dtype.name in DTYPES:
+        import numpy as np
+
+        array = np.ascontiguousarray(value, dtype=value.dtype.newbyteorder("<"))
+        buffers.append(memoryview(array).cast("B"))
+        return {"__array__": len(buffers) - 1, "dtype": array.dtype.name, "shape": list(array.shape)}
+    return value
+
+
+def _restore(value: Any, payload: bytearray, buffers: List[Tuple[int, int]]) -> Any:
+    if isinstance(value, list):
+        return [_restore(item, payload, buffers) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__array__" not in value:
+        return {key: _restore(item, payload, buffers) for key, item in value.items()}
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover - numpy unavailable
+        raise FrameError("Decoding binary arrays requires numpy.") from None
+    index, dtype, shape = value["__array__"], value.get("dtype"), value.get("shape")
+    if dtype not in DTYPES or not isinstance(index, int) or not 0 <= index < len(buffers):
+        raise FrameError("Frame array reference is malformed.")
+    offset, nbytes = buffers[index]
+    item = np.dtype(dtype).newbyteorder("<")
+    array = np.frombuffer(payload, dtype=item, count=nbytes // item.itemsize, offset=offset)
+    try:
+        return array.reshape(shape)
+    except (TypeError, ValueError):
+        raise FrameError("Frame array shape does not match its buffer.") from None
+
+
+__all__ = [
+    "MEDIA_TYPE",
+    "STREAM_MEDIA_TYPE",
+    "FrameError",
+    "accepts",
+    "decode",
+    "encode",
+    "encode_stream_item",
+]
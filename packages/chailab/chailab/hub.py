@@ -0,0 +1,152 @@
+"""Serve several interfaces from one app and server."""
+
+from __future__ import annotations
+
+import contextlib
+import html
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, Mapping, Optional
+
+from . import _web
+from .assets import static_bundle
+from .blocks import Blocks, mount_prefix
+from .codec import Codec
+from .executors import FunctionExecutor
+from .metrics import Metrics
+
+# Paths the hub serves itself.
+_RESERVED = {"/config", "/debug", "/metrics", "/static"}
+_CARD_CLASSES = "block rounded-lg border bg-card p-4 shadow-sm"
+
+
+class Hub(Blocks):
+    """Mount several interfaces under path prefixes of one app.
+
+    ::
+
+        hub = cl.Hub({"/echo": echo_demo, "/chat": chat_demo}, metrics=True)
+        hub.launch()
+
+    All interfaces run on one server and event loop. The root page links to
+    each of them. With ``metrics`` the hub serves one ``/metrics`` for all of
+    them, labelling per-app series with ``app="/echo"`` and so on. With
+    ``executor`` every interface that was not given its own executor runs
+    its fn on that pool; by default they already share the event loop's
+    thread pool.
+
+    ``launch(profile=True)`` profiles requests to every mounted interface.
+    """
+
+    def __init__(
+        self,
+        apps: Optional[Mapping[str, Blocks]] = None,
+        *,
+        title: str = "ChaiLab",
+        description: str = "",
+        theme: str = "default",
+        executor: Optional[Executor] = None,
+        metrics: bool | Metrics = False,
+        codec: Codec | str | None = None,
+    ) -> None:
+        super().__init__(title=title, description=description, theme=theme, metrics=metrics, codec=codec)
+        self.shared_executor = executor
+        self.apps: Dict[str, Blocks] = {}
+        for path, blocks in (apps or {}).items():
+            self.add(path, blocks)
+
+    def add(self, path: str, blocks: Blocks) -> "Hub":
+        """Mount ``blocks`` under ``path``; call before the hub is launched."""
+
+        if self.app is not None:
+            raise RuntimeError("Add interfaces before the hub app is created.")
+        prefix = mount_prefix(path)
+        if prefix in self.apps or prefix in _RESERVED:
+            raise ValueError(f"Mount path {prefix!r} is already in use.")
+        if blocks.app is not None:
+            raise ValueError("Mount an interface before its app is created.")
+        if self.shared_executor is not None and blocks.executor.kind is None:
+            blocks.executor = FunctionExecutor(blocks.executor.fn, self.shared_executor)
+        if self.metrics is not None:
+            blocks.metrics = self.metrics
+            blocks._parent_serves_metrics = True
+        blocks._metric_labels = {"app": prefix}
+        self.apps[prefix] = blocks
+        return self
+
+    # ------------------------------------------------------------------
+    # FastAPI application
+    # ------------------------------------------------------------------
+    def _create_app(self):
+        app = _web.FastAPI(title=self.title, description=self.description, lifespan=self._lifespan)
+        self._mount_static(app)
+        if self.metrics is not None:
+            self._mount_metrics(app, self.metrics)
+        if self.profiler is not None:
+            self._mount_profiling(app, self.profiler)
+        page = self._build_page()
+
+        @app.api_route("/", methods=["GET", "HEAD"])
+        async def root(request: _web.Request):
+            return page.respond(request)
+
+        @app.get("/config")
+        async def config():
+            return {"title": self.title, "description": self.description, "apps": self._app_summaries()}
+
+        for prefix, blocks in self.apps.items():
+            app.mount(prefix, blocks._ensure_app())
+        return app
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app: _web.FastAPI) -> AsyncIterator[None]:
+        """Start and stop every mounted interface with the hub."""
+
+        async with contextlib.AsyncExitStack() as stack:
+            for blocks in self.apps.values():
+                await stack.enter_async_context(blocks._lifespan(blocks.app))
+            yield
+
+    def _register_metrics(self, metrics: Metrics) -> None:
+        apps = self.apps
+        metrics.callback("chailab_hub_apps", "Interfaces mounted in the hub.", lambda: len(apps))
+
+    def _app_summaries(self) -> list:
+        return [
+            {"path": prefix, "title": blocks.title, "description": blocks.description}
+            for prefix, blocks in self.apps.items()
+        ]
+
+    def _render_html(self) -> str:
+        # A plain page: the hub has no frontend bundle of its own.
+        links = "\n".join(
+            f"""            <a href="{html.escape(app['path'].lstrip('/'))}/" class="{_CARD_CLASSES}">
+                <span class="text-lg font-medium">{html.escape(app['title'])}</span>
+                <p class="text-sm text-muted-foreground">{html.escape(app['description'])}</p>
+            </a>"""
+            for app in self._app_summaries()
+        )
+        description = html.escape(self.description)
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{html.escape(self.title)}</title>
+    <link rel="stylesheet" href="{static_bundle().url('chailab.css')}" />
+</head>
+<body class="min-h-screen bg-background py-6">
+    <div class="container mx-auto max-w-3xl px-4 space-y-6">
+        <div class="space-y-2">
+            <h1 class="text-2xl font-semibold">{html.escape(self.title)}</h1>
+            <p class="text-muted-foreground">{description}</p>
+        </div>
+        <div class="space-y-4">
+{links}
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+
+__all__ = ["Hub"]
@@ -2,16 +2,17 @@
 
 from __future__ import annotations
 
-import asyncio
 import inspect
-import json
-from typing import Any, Callable, Iterable, List, Sequence
-
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
-
-from .blocks import Blocks
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence
+
+from . import _web, frames
+from .batching import Batcher
+from .blocks import Blocks, ClientDisconnected, Event, RequestError
+from .cache import ResultCache
+from .codec import Codec
+from .executors import ExecutorSpec, FunctionExecutor
+from .metrics import Metrics
+from .queueing import QueueFullError
 from .ui import Component, component_registry, Text
 
 
@@ -35,11 +36,45 @@ class Interface(Blocks):
         title: str = "ChaiLab Demo",
         description: str = "",
         theme: str = "default",
+        batch: bool = False,
+        max_batch_size: int = 4,
+        max_batch_wait_ms: float = 10.0,
+        concurrency_limit: int | None = None,
+        max_queue_size: int | None = None,
+        executor: ExecutorSpec = None,
+        workers: int | None = None,
+        cache: bool | ResultCache = False,
+        metrics: bool | Metrics = False,
+        codec: Codec | str | None = None,
     ) -> None:
-        super().__init__(title=title, description=description, theme=theme)
+        super().__init__(
+            title=title,
+            description=description,
+            theme=theme,
+            concurrency_limit=concurrency_limit,
+            max_queue_size=max_queue_size,
+            metrics=metrics,
+            codec=codec,
+        )
         self.fn = fn
+        self.executor = FunctionExecutor(fn, executor, workers)
         self.inputs = self._normalise_components(inputs, role="input")
         self.outputs = self._normalise_components(outputs, role="output")
+        self.batch = batch
+        self._batcher: Batcher | None = None
+        if batch:
+            if self.is_streaming:
+                raise ValueError("Batched functions cannot be generators.")
+            if concurrency_limit is not None and concurrency_limit < max_batch_size:
+                raise ValueError("concurrency_limit must be at least max_batch_size, or batches never fill.")
+            self._batcher = Batcher(
+                self._run_batch,
+                max_batch_size=max_batch_size,
+                max_batch_wait_ms=max_batch_wait_ms,
+            )
+        self.cache: ResultCache | None = ResultCache() if cache is True else (cache or None)
+        if self.cache is not None and self.is_streaming:
+            raise ValueError("Results of generator functions cannot be cached.")
 
     # ------------------------------------------------------------------
     # Component helpers
@@ -94,18 +129,21 @@ class Interface(Blocks):
     # FastAPI application construction
     # ------------------------------------------------------------------
     def _create_app(self):
-        app = FastAPI(title=self.title, description=self.description)
+        app = _web.FastAPI(title=self.title, description=self.description, lifespan=self._lifespan)
         app.add_middleware(
-            CORSMiddleware,
+            _web.CORSMiddleware,
             allow_origins=["*"],
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
         )
 
-        @app.get("/", response_class=HTMLResponse)
-        async def root():
-            return self._render_html()
+        self._mount_common_routes(app)
+        page = self._build_page()
+
+        @app.api_route("/", methods=["GET", "HEAD"])
+        async def root(request: _web.Request):
+            return page.respond(request)
 
         @app.get("/config")
         async def config():
@@ -113,49 +151,209 @@ class Interface(Blocks):
                 "title": self.title,
                 "description": self.description,
                 "theme": self.theme,
+                "streaming": self.is_streaming,
                 "components": self._build_component_configs(),
             }
 
         @app.post("/api/predict")
-        async def predict(request: Request):
-            payload = await request.json()
-            inputs = payload.get("inputs", [])
-            if not isinstance(inputs, list):
-                return JSONResponse({"success": False, "error": "Inputs must be a list."}, status_code=400)
+        async def predict(request: _web.Request):
             try:
-                outputs = await self._execute(inputs)
+                inputs = self._parse_inputs(await self._read_payload(request))
+            except RequestError as exc:
+                return self._error_response(exc)
+            cached = self._cached_outputs(inputs)
+            if cached is not None:
+                return self._negotiated_response(request, {"success": True, "outputs": cached})
+
+            async def run() -> List[Any]:
+                async with self.queue.slot():
+                    return await self._execute(inputs)
+
+            try:
+                outputs = await self._unless_disconnected(request, run)
+            except ClientDisconnected:
+                return _web.Response(status_code=499)
+            except QueueFullError as exc:
+                return self._busy_response(exc)
             except Exception as exc:  # pragma: no cover - surface runtime error
-                return JSONResponse({"success": False, "error": str(exc)}, status_code=500)
-            return {"success": True, "outputs": outputs}
+                return _web.JSONResponse({"success": False, "error": str(exc)}, status_code=500)
+            return self._negotiated_response(request, {"success": True, "outputs": outputs})
+
+        if self.cache is not None:
+            cache = self.cache
+
+            @app.get("/api/cache/stats")
+            async def cache_stats():
+                return cache.stats()
+
+        if self._batcher is not None:
+            batcher = self._batcher
+
+            @app.get("/api/batch/stats")
+            async def batch_stats():
+                return batcher.stats.as_dict()
+
+        @app.post("/api/predict/stream")
+        async def predict_stream(request: _web.Request):
+            try:
+                inputs = self._parse_inputs(await self._read_payload(request))
+            except RequestError as exc:
+                return self._error_response(exc)
+            framed = frames.accepts(request.headers.get("accept"), frames.STREAM_MEDIA_TYPE)
+            cached = self._cached_outputs(inputs)
+            if cached is not None:
+                return self._event_response(self._cached_events(cached), framed=framed)
+            try:
+                ticket = self.queue.enqueue()
+            except QueueFullError as exc:
+                return self._busy_response(exc)
+            events = self._queued_events(ticket, lambda: self._stream_events(inputs))
+            return self._event_response(events, framed=framed)
 
         return app
 
+    @staticmethod
+    def _parse_inputs(payload: Dict[str, Any]) -> List[Any]:
+        inputs = payload.get("inputs", [])
+        if not isinstance(inputs, list):
+            raise RequestError("Inputs must be a list.")
+        return inputs
+
+    async def _socket_events(self, payload: Dict[str, Any]) -> AsyncIterator[Event]:
+        """Answer a ``{"type": "predict", "inputs": [...]}`` socket message."""
+
+        if payload.get("type") != "predict":
+            raise RequestError(f"Unsupported message type {payload.get('type')!r}.")
+        inputs = self._parse_inputs(payload)
+        cached = self._cached_outputs(inputs)
+        events = self._cached_events(cached) if cached is not None else None
+        if events is None:
+            ticket = self.queue.enqueue()
+            events = self._queued_events(ticket, lambda: self._stream_events(inputs))
+        async for event in events:
+            yield event
+
+    async def _stream_events(self, inputs: List[Any]) -> AsyncIterator[Event]:
+        """Turn streamed outputs into ``outputs`` events ending in ``done`` or ``error``."""
+
+        try:
+            async for outputs in self._stream(inputs):
+                yield {"type": "outputs", "outputs": outputs}
+        except Exception as exc:  # pragma: no cover - surface runtime error
+            yield {"type": "error", "error": str(exc)}
+            return
+        yield {"type": "done"}
+
+    async def _cached_events(self, outputs: List[Any]) -> AsyncIterator[Event]:
+        yield {"type": "outputs", "outputs": outputs}
+        yield {"type": "done"}
+
     async def _execute(self, inputs: List[Any]) -> List[Any]:
-        args = inputs
-        fn = self.fn
+        outputs: List[Any] = []
+        async for outputs in self._stream(inputs):
+            pass
+        return outputs
 
-        if inspect.iscoroutinefunction(fn):
-            result = await fn(*args)
-        else:
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = None
+    async def _stream(self, inputs: List[Any]) -> AsyncIterator[List[Any]]:
+        """Yield the output list for every value ``fn`` produces.
+
+        Generator functions yield progressively refined outputs; regular
+        functions produce a single output list.
+        """
+
+        if self._batcher is not None:
+            if len(inputs) != len(self.inputs):
+                raise ValueError(f"Expected {len(self.inputs)} inputs, got {len(inputs)}.")
+            with self._phase("execute"):
+                outputs = await self._batcher.submit(inputs)
+            self._store_outputs(inputs, outputs)
+            yield outputs
+            return
+
+        async for item in self._execute_results(self.fn, *inputs):
+            outputs = self._normalise_outputs(item)
+            self._store_outputs(inputs, outputs)
+            yield outputs
+
+    def _register_metrics(self, metrics: Metrics) -> None:
+        super()._register_metrics(metrics)
+        labels = self._metric_labels
+        if self.cache is not None:
+            cache = self.cache
+            metrics.callback(
+                "chailab_cache_hits_total", "Result cache hits.", lambda: cache.hits, kind="counter", **labels
+            )
+            metrics.callback(
+                "chailab_cache_misses_total", "Result cache misses.", lambda: cache.misses, kind="counter", **labels
+            )
+            metrics.callback(
+                "chailab_cache_hit_ratio",
+                "Share of cache lookups that were hits.",
+                lambda: cache.stats()["hit_rate"],
+                **labels,
+            )
+        if self._batcher is not None:
+            stats = self._batcher.stats
+            metrics.callback(
+                "chailab_batches_total", "Batches dispatched to fn.", lambda: stats.batches, kind="counter", **labels
+            )
+            metrics.callback(
+                "chailab_batch_items_total", "Requests served in batches.", lambda: stats.items, kind="counter", **labels
+            )
+
+    # ------------------------------------------------------------------
+    # Result cache
+    # ------------------------------------------------------------------
+    def _cached_outputs(self, inputs: List[Any]) -> List[Any] | None:
+        """Return memoised outputs for ``inputs``; hits skip the request queue."""
 
-            if loop and loop.is_running():
-                result = await loop.run_in_executor(None, lambda: fn(*args))
-            else:
-                result = fn(*args)
+        if self.cache is None:
+            return None
+        key = self.cache.key(self.fn, inputs)
+        return self.cache.get(key) if key is not None else None
 
-        if inspect.isasyncgen(result):
-            result = [item async for item in result]
-        elif inspect.isgenerator(result):
-            result = list(result)
+    def _store_outputs(self, inputs: List[Any], outputs: List[Any]) -> None:
+        if self.cache is None:
+            return
+        key = self.cache.key(self.fn, inputs)
+        if key is not None:
+            self.cache.set(key, outputs, fn=self.fn)
 
+    def clear_cache(self) -> None:
+        """Forget every memoised result of this interface's fn."""
+
+        if self.cache is not None:
+            self.cache.invalidate(self.fn)
+
+    async def _run_batch(self, batch: List[List[Any]]) -> List[List[Any]]:
+        """Call ``fn`` once for a whole batch and split the results per request.
+
+        Like ``gradio``, a batched fn receives one list per input component
+        and returns one list per output component.
+        """
+
+        columns = [list(column) for column in zip(*batch)]
+        result = await self._call_fn(self.fn, *columns)
+        outputs = self._normalise_outputs(result)
+        if len(outputs) != len(self.outputs) or any(
+            not isinstance(column, (list, tuple)) or len(column) != len(batch) for column in outputs
+        ):
+            raise ValueError("A batched fn must return one list per output, each as long as the batch.")
+        return [list(row) for row in zip(*outputs)]
+
+    @staticmethod
+    def _normalise_outputs(result: Any) -> List[Any]:
         if not isinstance(result, (list, tuple)):
             result = [result]
         return list(result)
 
+    @property
+    def is_streaming(self) -> bool:
+        """Whether ``fn`` yields progressive outputs."""
+
+        fn = self.fn
+        return inspect.isgeneratorfunction(fn) or inspect.isasyncgenfunction(fn)
+
     # ------------------------------------------------------------------
     # Rendering helpers
     # ------------------------------------------------------------------
@@ -163,264 +361,10 @@ class Interface(Blocks):
         config = {
             "title": self.title,
             "description": self.description,
+            "streaming": self.is_streaming,
             "components": self._build_component_configs(),
         }
-        config_json = json.dumps(config)
-
-        return f"""
-        <!DOCTYPE html>
-        <html lang=\"en\">
-        <head>
-            <meta charset=\"UTF-8\" />
-            <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\" />
-            <title>{self.title}</title>
-            <script src=\"https://cdn.tailwindcss.com\"></script>
-            <script>
-                tailwind.config = {{
-                    theme: {{
-                        extend: {{
-                            colors: {{
-                                border: 'hsl(var(--border))',
-                                input: 'hsl(var(--input))',
-                                ring: 'hsl(var(--ring))',
-                                background: 'hsl(var(--background))',
-                                foreground: 'hsl(var(--foreground))',
-                                primary: {{
-                                    DEFAULT: 'hsl(var(--primary))',
-                                    foreground: 'hsl(var(--primary-foreground))'
-                                }},
-                                secondary: {{
-                                    DEFAULT: 'hsl(var(--secondary))',
-                                    foreground: 'hsl(var(--secondary-foreground))'
-                                }},
-                                destructive: {{
-                                    DEFAULT: 'hsl(var(--destructive))',
-                                    foreground: 'hsl(var(--destructive-foreground))'
-                                }},
-                                muted: {{
-                                    DEFAULT: 'hsl(var(--muted))',
-                                    foreground: 'hsl(var(--muted-foreground))'
-                                }},
-                                accent: {{
-                                    DEFAULT: 'hsl(var(--accent))',
-                                    foreground: 'hsl(var(--accent-foreground))'
-                                }},
-                                card: {{
-                                    DEFAULT: 'hsl(var(--card))',
-                                    foreground: 'hsl(var(--card-foreground))'
-                                }}
-                            }},
-                            borderRadius: {{
-                                lg: 'var(--radius)',
-                                md: 'calc(var(--radius) - 2px)',
-                                sm: 'calc(var(--radius) - 4px)'
-                            }}
-                        }}
-                    }}
-                }}
-            </script>
-            <script src=\"https://unpkg.com/react@18/umd/react.development.js\"></script>
-            <script src=\"https://unpkg.com/react-dom@18/umd/react-dom.development.js\"></script>
-            <script src=\"https://unpkg.com/@babel/standalone/babel.min.js\"></script>
-            <style>
-                :root {{
-                    --background: 0 0% 100%;
-                    --foreground: 222.2 84% 4.9%;
-                    --card: 0 0% 100%;
-                    --card-foreground: 222.2 84% 4.9%;
-                    --popover: 0 0% 100%;
-                    --popover-foreground: 222.2 84% 4.9%;
-                    --primary: 222.2 47.4% 11.2%;
-                    --primary-foreground: 210 40% 98%;
-                    --secondary: 210 40% 96%;
-                    --secondary-foreground: 222.2 47.4% 11.2%;
-                    --muted: 210 40% 96%;
-                    --muted-foreground: 215.4 16.3% 46.9%;
-                    --accent: 210 40% 96%;
-                    --accent-foreground: 222.2 47.4% 11.2%;
-                    --destructive: 0 84.2% 60.2%;
-                    --destructive-foreground: 210 40% 98%;
-                    --border: 214.3 31.8% 91.4%;
-                    --input: 214.3 31.8% 91.4%;
-                    --ring: 222.2 84% 4.9%;
-                    --radius: 0.5rem;
-                }}
-            </style>
-        </head>
-        <body class=\"min-h-screen bg-background py-6\">
-            <div id=\"app\" class=\"container mx-auto max-w-4xl px-4\"></div>
-            <script type=\"text/babel\">
-                const interfaceConfig = {config_json};
-
-                function useInitialInputState() {{
-                    const state = {{}};
-                    interfaceConfig.components.inputs.forEach((config) => {{
-                        if (config.type === 'slider') {{
-                            const value = Array.isArray(config.props.value) ? config.props.value[0] : (config.props.value ?? config.props.min ?? 0);
-                            state[config.id] = value;
-                        }} else {{
-                            state[config.id] = config.props.value ?? '';
-                        }}
-                    }});
-                    return state;
-                }}
-
-                function InputComponent({{ config, value, onChange }}) {{
-                    if (config.type === 'input') {{
-                        return (
-                            <div className=\"space-y-2\">
-                                <label className=\"text-sm font-medium leading-none peer-disabled:cursor-not-allowed peer-disabled:opacity-70\">
-                                    {{config.label}}
-                                </label>
-                                <input
-                                    type={{config.props.type || 'text'}}
-                                    placeholder={{config.props.placeholder || ''}}
-                                    value={{value}}
-                                    disabled={{config.props.disabled}}
-                                    className=\"flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm ring-offset-background placeholder:text-muted-foreground focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50\"
-                                    onChange={{(event) => onChange(event.target.value)}}
-                                />
-                                {{config.props.error ? (
-                                    <p className=\"text-sm text-destructive\">{{config.props.error}}</p>
-                                ) : null}}
-                            </div>
-                        );
-                    }}
-
-                    if (config.type === 'slider') {{
-                        return (
-                            <div className=\"space-y-4\">
-                                <div className=\"flex items-center justify-between\">
-                                    <label className=\"text-sm font-medium leading-none peer-disabled:cursor-not-allowed peer-disabled:opacity-70\">
-                                        {{config.label}}
-                                    </label>
-                                    <span className=\"text-sm text-muted-foreground\">{{value}}</span>
-                                </div>
-                                <input
-                                    type=\"range\"
-                                    min={{config.props.min ?? 0}}
-                                    max={{config.props.max ?? 100}}
-                                    step={{config.props.step ?? 1}}
-                                    value={{value}}
-                                    disabled={{config.props.disabled}}
-                                    onChange={{(event) => onChange(parseFloat(event.target.value))}}
-                                    className=\"w-full h-2 rounded-lg bg-secondary\"
-                                />
-                            </div>
-                        );
-                    }}
-
-                    return (
-                        <div className=\"space-y-2\">
-                            <label className=\"text-sm font-medium leading-none\">{{config.label}}</label>
-                            <div className=\"text-sm text-muted-foreground\">Unsupported input: {{config.type}}</div>
-                        </div>
-                    );
-                }}
-
-                function OutputComponent({{ config, value }}) {{
-                    return (
-                        <div className=\"space-y-2\">
-                            <label className=\"text-sm font-medium leading-none peer-disabled:cursor-not-allowed peer-disabled:opacity-70\">
-                                {{config.label}}
-                            </label>
-                            <div className=\"flex min-h-[40px] w-full items-center rounded-md border border-input bg-muted px-3 py-2 text-sm ring-offset-background\">
-                                {{value ?? config.props.placeholder ?? 'Output will appear here'}}
-                            </div>
-                        </div>
-                    );
-                }}
-
-                function App() {{
-                    const [inputValues, setInputValues] = React.useState(() => useInitialInputState());
-                    const [outputs, setOutputs] = React.useState([]);
-                    const [isLoading, setIsLoading] = React.useState(false);
-                    const [error, setError] = React.useState(null);
-
-                    const handleChange = (id, nextValue) => {{
-                        setInputValues((prev) => ({{ ...prev, [id]: nextValue }}));
-                    }};
-
-                    const handleSubmit = async () => {{
-                        const payload = interfaceConfig.components.inputs.map((config) => inputValues[config.id]);
-                        setIsLoading(true);
-                        setError(null);
-                        try {{
-                            const response = await fetch('/api/predict', {{
-                                method: 'POST',
-                                headers: {{ 'Content-Type': 'application/json' }},
-                                body: JSON.stringify({{ inputs: payload }}),
-                            }});
-                            const data = await response.json();
-                            if (data.success) {{
-                                setOutputs(data.outputs);
-                            }} else {{
-                                setError(data.error || 'Unknown error');
-                            }}
-                        }} catch (err) {{
-                            setError(err.message);
-                        }} finally {{
-                            setIsLoading(false);
-                        }}
-                    }};
-
-                    return (
-                        <div className=\"space-y-6\">
-                            <div className=\"rounded-lg border bg-card text-card-foreground shadow-sm p-6 space-y-6\">
-                                <div className=\"space-y-2\">
-                                    <h1 className=\"text-2xl font-semibold\">{{interfaceConfig.title}}</h1>
-                                    {{interfaceConfig.description ? (
-                                        <p className=\"text-muted-foreground\">{{interfaceConfig.description}}</p>
-                                    ) : null}}
-                                </div>
-
-                                <div className=\"grid grid-cols-1 gap-6 md:grid-cols-2\">
-                                    <div className=\"space-y-4\">
-                                        <h3 className=\"text-lg font-medium\">Inputs</h3>
-                                        {{interfaceConfig.components.inputs.map((config) => (
-                                            <InputComponent
-                                                key={{config.id}}
-                                                config={{config}}
-                                                value={{inputValues[config.id]}}
-                                                onChange={{(value) => handleChange(config.id, value)}}
-                                            />
-                                        ))}}
-                                    </div>
-                                    <div className=\"space-y-4\">
-                                        <h3 className=\"text-lg font-medium\">Outputs</h3>
-                                        {{interfaceConfig.components.outputs.map((config, index) => (
-                                            <OutputComponent
-                                                key={{config.id}}
-                                                config={{config}}
-                                                value={{outputs[index]}}
-                                            />
-                                        ))}}
-                                    </div>
-                                </div>
-
-                                <div className=\"flex items-center justify-between\">
-                                    {{error ? (
-                                        <p className=\"text-sm text-destructive\">{{error}}</p>
-                                    ) : <span />}}
-                                    <button
-                                        onClick={{handleSubmit}}
-                                        disabled={{isLoading}}
-                                        className=\"inline-flex items-center justify-center whitespace-nowrap rounded-md bg-primary px-4 py-2 text-sm font-medium text-primary-foreground transition-colors hover:bg-primary/90 focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50\"
-                                    >
-                                        {{isLoading ? 'Running…' : 'Submit'}}
-                                    </button>
-                                </div>
-                            </div>
-                        </div>
-                    );
-                }}
-
-                const root = ReactDOM.createRoot(document.getElementById('app'));
-                root.render(<App />);
-            </script>
-        </body>
-        </html>
-        """
+        return self._render_shell(config, entry="interface.js", container_class="container mx-auto max-w-4xl px-4")
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -0,0 +1,235 @@
+"""Prometheus-style runtime metrics for ChaiLab apps."""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._render_samples()
+
+    def _render_samples(self) -> Iterator[str]:  # pragma: no cover - implemented by subclasses
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def _render_samples(self) -> Iterator[str]:
+        for key, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelValues, List[float]] = {}  # per bucket counts, then sum and count
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self) -> Iterator[str]:
+        for key, series in self.values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, le)} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {_format_value(series[-1])}"
+
+
+class Callback(_Metric):
+    """A metric whose values are read from callbacks each time metrics are scraped.
+
+    Each label combination has its own callback, so apps sharing a registry
+    can report the same metric side by side.
+    """
+
+    def __init__(self, name: str, help: str, *, kind: str = "gauge", labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self.kind = kind
+        self.series: Dict[LabelValues, Callable[[], float]] = {}
+
+    def add(self, fn: Callable[[], float], **labels: Any) -> None:
+        self.series[self._key(labels)] = fn
+
+    def _render_samples(self) -> Iterator[str]:
+        for key, fn in self.series.items():
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(fn())}"
+
+
+class Metrics:
+    """Registry for the metrics an app exposes at ``/metrics``.
+
+    The standard request, phase, executor and streaming metrics are created
+    up front. Interfaces add callbacks for state they own, such as cache
+    and queue statistics. Values live in the serving process, so with
+    several workers each one reports its own numbers.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self.requests = self.register(
+            Counter("chailab_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+        )
+        self.request_duration = self.register(
+            Histogram(
+                "chailab_request_duration_seconds",
+                "HTTP request latency, until the last body byte is sent.",
+                ("method", "route"),
+            )
+        )
+        self.in_flight = self.register(Gauge("chailab_requests_in_flight", "HTTP requests being served."))
+        self.sockets = self.register(Gauge("chailab_websocket_connections", "Open WebSocket connections."))
+        self.phases = self.register(
+            Histogram(
+                "chailab_phase_duration_seconds",
+                "Time spent per request phase: parse, queue, execute or serialize.",
+                ("phase",),
+            )
+        )
+        self.chunks = self.register(Counter("chailab_stream_chunks_total", "Streamed chunk and output events."))
+
+    def register(self, metric: Any) -> Any:
+        """Add ``metric``, replacing any earlier metric with the same name."""
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def callback(self, name: str, help: str, fn: Callable[[], float], *, kind: str = "gauge", **labels: Any) -> Callback:
+        """Report ``fn()`` as ``name``, next to earlier callbacks with other ``labels``."""
+
+        metric = self._metrics.get(name)
+        if not (labels and isinstance(metric, Callback) and metric.labels == tuple(labels)):
+            metric = self.register(Callback(name, help, kind=kind, labels=tuple(labels)))
+        metric.add(fn, **labels)
+        return metric
+
+    def phase(self, name: str):
+        """Context manager timing one ``name`` phase of a request."""
+
+        return self.phases.time(phase=name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing requests per route template."""
+
+    def __init__(self, app: Any, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "websocket":
+            self.metrics.sockets.inc()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.metrics.sockets.dec()
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight.dec()
+            # Routes of mounted apps are reported with their mount prefix.
+            template = getattr(scope.get("route"), "path", None)
+            route = scope.get("root_path", "") + template if template else "unmatched"
+            method = scope.get("method", "")
+            self.metrics.request_duration.observe(time.perf_counter() - start, method=method, route=route)
+            self.metrics.requests.inc(method=method, route=route, status=status or 500)
+
+
+__all__ = ["CONTENT_TYPE", "Counter", "Gauge", "Histogram", "Metrics", "MetricsMiddleware"]
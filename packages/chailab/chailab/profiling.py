@@ -0,0 +1,305 @@
+"""On-demand profiling of individual requests."""
+
+from __future__ import annotations
+
+import collections
+import contextvars
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+from urllib.parse import parse_qs
+
+MODES = ("deterministic", "sampling")
+HEADER = "x-chailab-profile"
+
+_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "chailab_profile", default=None
+)
+
+
+def run_profiled(fn: Callable, *args: Any) -> Any:
+    """Call ``fn`` in a worker thread, profiling it if its request is profiled."""
+
+    session = _session.get()
+    if session is None:
+        return fn(*args)
+    return session.run_in_thread(fn, *args)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+@dataclass
+class Profile:
+    """One finished request profile."""
+
+    id: int
+    mode: str
+    method: str
+    path: str
+    started: float
+    duration: float = 0.0
+    stats: Optional[pstats.Stats] = None
+    stacks: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "method": self.method,
+            "path": self.path,
+            "started": self.started,
+            "duration": self.duration,
+            "formats": ["text", "pstats"] if self.stats is not None else ["collapsed"],
+        }
+
+    def text(self, limit: int = 60) -> str:
+        if self.stats is None:
+            return self.collapsed()
+        out = io.StringIO()
+        self.stats.stream = out
+        self.stats.sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def pstats_dump(self) -> bytes:
+        """The profile in the binary format ``pstats``, snakeviz and friends load."""
+
+        if self.stats is None:
+            raise ValueError("Sampled profiles have no pstats data.")
+        return marshal.dumps(self.stats.stats)
+
+    def collapsed(self) -> str:
+        """Folded stacks, one ``frame;frame;frame count`` line each, for flamegraph tools."""
+
+        if self.stats is not None:
+            raise ValueError("Deterministic profiles have no stack samples; use mode='sampling'.")
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ProfileSession:
+    """Collects profile data for one request across the loop and worker threads."""
+
+    def __init__(self, profile: Profile, interval: float) -> None:
+        self.profile = profile
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._profilers: List[cProfile.Profile] = []
+        self._threads: Set[int] = set()
+        self._stacks: Dict[str, int] = collections.Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._main: Optional[cProfile.Profile] = None
+        self._start = 0.0
+
+    @property
+    def sampling(self) -> bool:
+        return self.profile.mode == "sampling"
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        if self.sampling:
+            self._threads.add(threading.get_ident())
+            self._sampler = threading.Thread(target=self._sample, name="chailab-profiler", daemon=True)
+            self._sampler.start()
+        else:
+            self._main = self._enable()
+
+    def stop(self) -> Profile:
+        self.profile.duration = time.perf_counter() - self._start
+        if self.sampling:
+            self._stop.set()
+            if self._sampler is not None:
+                self._sampler.join()
+            self.profile.stacks = dict(self._stacks)
+            return self.profile
+        if self._main is not None:
+            self._main.disable()
+            self._profilers.append(self._main)
+        with self._lock:
+            profilers = [p for p in self._profilers if p.getstats()]
+        if profilers:
+            stats = pstats.Stats(profilers[0])
+            for extra in profilers[1:]:
+                stats.add(extra)
+            self.profile.stats = stats
+        return self.profile
+
+    def run_in_thread(self, fn: Callable, *args: Any) -> Any:
+        if self.sampling:
+            ident = threading.get_ident()
+            with self._lock:
+                self._threads.add(ident)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._threads.discard(ident)
+        profiler = self._enable()
+        try:
+            return fn(*args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                with self._lock:
+                    self._profilers.append(profiler)
+
+    @staticmethod
+    def _enable() -> Optional[cProfile.Profile]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from a single active profiler
+            # and refuses a second one, which the first already covers.
+            return None
+        return profiler
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = list(self._threads)
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+
+
+class Profiler:
+    """Profile selected requests and keep the most recent results in memory.
+
+    A request is profiled when it asks for it, with an ``X-Chailab-Profile``
+    header or a ``profile`` query parameter, or when it is picked at random
+    by ``sample_rate``. At most one request is profiled at a time and a new
+    profile starts at most every ``min_interval`` seconds. Other requests
+    run unprofiled, so the profiler is cheap enough to leave enabled.
+
+    Args:
+        mode: ``"deterministic"`` records every call with :mod:`cProfile`
+            and reports ``pstats`` output. ``"sampling"`` snapshots the
+            request's threads' stacks every ``interval`` seconds and reports
+            collapsed stacks for flamegraph tools, at lower overhead.
+        keep: Number of finished profiles kept.
+        min_interval: Minimum seconds between the starts of two profiles.
+        sample_rate: Share of requests profiled without asking, 0 to 1.
+        interval: Stack sampling period in ``"sampling"`` mode.
+
+    Deterministic profiles of the event loop thread also record other
+    requests the loop serves meanwhile.
+    """
+
+    def __init__(
+        self,
+        mode: str = "deterministic",
+        *,
+        keep: int = 20,
+        min_interval: float = 5.0,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; expected one of {', '.join(MODES)}.")
+        if keep < 1:
+            raise ValueError("keep must be at least 1.")
+        self.mode = mode
+        self.min_interval = min_interval
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.profiles: Deque[Profile] = collections.deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._active = False
+        self._last_start = float("-inf")
+
+    def wants(self, scope: Dict[str, Any]) -> bool:
+        """Whether the request asked to be profiled or was sampled."""
+
+        for name, value in scope.get("headers", ()):
+            if name == HEADER.encode() and value not in (b"", b"0"):
+                return True
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if query.get("profile", ["0"])[0] not in ("", "0"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def begin(self, method: str, path: str) -> Optional[ProfileSession]:
+        """Start a session unless one is running or the rate limit applies."""
+
+        now = time.monotonic()
+        if self._active or now - self._last_start < self.min_interval:
+            return None
+        self._active = True
+        self._last_start = now
+        profile = Profile(id=next(self._ids), mode=self.mode, method=method, path=path, started=time.time())
+        session = ProfileSession(profile, self.interval)
+        session.start()
+        return session
+
+    def end(self, session: ProfileSession) -> Profile:
+        try:
+            profile = session.stop()
+            self.profiles.append(profile)
+            return profile
+        finally:
+            self._active = False
+
+    def get(self, profile_id: int) -> Optional[Profile]:
+        for profile in self.profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+
+class ProfilerMiddleware:
+    """ASGI middleware that profiles the HTTP requests :class:`Profiler` selects.
+
+    Profiled responses carry an ``X-Chailab-Profile`` header with the
+    profile id, or ``skipped`` when the rate limit denied a request that
+    asked to be profiled.
+    """
+
+    def __init__(self, app: Any, profiler: Profiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/debug/") or not self.profiler.wants(scope):
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.begin(scope.get("method", ""), scope["path"])
+        label = str(session.profile.id).encode() if session is not None else b"skipped"
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (HEADER.encode(), label)]}
+            await send(message)
+
+        if session is None:
+            await self.app(scope, receive, send_wrapper)
+            return
+        token = _session.set(session)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _session.reset(token)
+            self.profiler.end(session)
+
+
+__all__ = ["Profile", "Profiler", "ProfilerMiddleware", "run_profiled"]
@@ -0,0 +1,159 @@
+"""Admission control: bounded concurrency with a bounded FIFO wait queue."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a request arrives while the wait queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Server is busy: the request queue is full.")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A request's place in a :class:`RequestQueue`."""
+
+    def __init__(self, queue: "RequestQueue", future: asyncio.Future) -> None:
+        self._queue = queue
+        self._future = future
+        self._released = False
+        if queue.on_admit is not None:
+            if future.done():
+                queue.on_admit(0.0)
+            else:
+                enqueued = asyncio.get_running_loop().time()
+                future.add_done_callback(lambda f: self._admitted(enqueued))
+
+    def _admitted(self, enqueued: float) -> None:
+        if self.admitted and self._queue.on_admit is not None:
+            self._queue.on_admit(asyncio.get_running_loop().time() - enqueued)
+
+    @property
+    def admitted(self) -> bool:
+        return self._future.done() and not self._future.cancelled()
+
+    @property
+    def position(self) -> int:
+        """1-based position among waiting requests, ``0`` once admitted."""
+
+        return self._queue._position(self._future)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until admitted or ``timeout`` elapses; return :attr:`admitted`."""
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        return self.admitted
+
+    def release(self) -> None:
+        """Give the slot back (or leave the queue). Safe to call twice."""
+
+        if self._released:
+            return
+        self._released = True
+        if self.admitted:
+            self._queue._release()
+        else:
+            self._future.cancel()
+            self._queue._discard(self._future)
+
+
+class RequestQueue:
+    """Run at most ``concurrency_limit`` requests; queue up to ``max_queue_size``.
+
+    Waiting requests are admitted in arrival order. ``None`` disables the
+    respective bound. When the queue is full :meth:`enqueue` raises
+    :class:`QueueFullError` so the caller can answer ``503`` right away
+    instead of letting latency and memory grow without limit.
+
+    ``on_admit``, if set, is called with each admitted request's wait time
+    in seconds.
+    """
+
+    def __init__(
+        self,
+        concurrency_limit: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        *,
+        retry_after: int = 1,
+    ) -> None:
+        if concurrency_limit is not None and concurrency_limit < 1:
+            raise ValueError("concurrency_limit must be at least 1.")
+        if max_queue_size is not None and max_queue_size < 0:
+            raise ValueError("max_queue_size must not be negative.")
+        self.concurrency_limit = concurrency_limit
+        self.max_queue_size = max_queue_size
+        self.retry_after = retry_after
+        self.on_admit: Optional[Callable[[float], None]] = None
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "concurrency_limit": self.concurrency_limit,
+            "max_queue_size": self.max_queue_size,
+        }
+
+    def enqueue(self) -> Ticket:
+        """Take a slot if one is free, otherwise join the wait queue."""
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        if self.concurrency_limit is None or (self._active < self.concurrency_limit and not self._waiters):
+            self._active += 1
+            future.set_result(None)
+        elif self.max_queue_size is not None and len(self._waiters) >= self.max_queue_size:
+            raise QueueFullError(self.retry_after)
+        else:
+            self._waiters.append(future)
+        return Ticket(self, future)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[Ticket]:
+        """Hold a slot for the duration of the ``async with`` block."""
+
+        ticket = self.enqueue()
+        try:
+            await ticket.wait()
+            yield ticket
+        finally:
+            ticket.release()
+
+    # ------------------------------------------------------------------
+    # Ticket callbacks
+    # ------------------------------------------------------------------
+    def _position(self, future: asyncio.Future) -> int:
+        try:
+            return self._waiters.index(future) + 1
+        except ValueError:
+            return 0
+
+    def _discard(self, future: asyncio.Future) -> None:
+        with contextlib.suppress(ValueError):
+            self._waiters.remove(future)
+
+    def _release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)  # hand the slot straight over
+                return
+        self._active -= 1
+
+
+__all__ = ["QueueFullError", "RequestQueue", "Ticket"]
@@ -0,0 +1,101 @@
+"""Pre-forking multi-worker server for ChaiLab apps."""
+
+from __future__ import annotations
+
+import contextlib
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict
+
+import uvicorn
+
+_RESPAWN_DELAY = 1.0
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app: Any, sock: socket.socket, log_level: str) -> None:
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve_prefork(app: Any, *, host: str, port: int, workers: int, log_level: str = "info") -> None:
+    """Serve ``app`` from ``workers`` forked processes sharing one socket.
+
+    The app, and everything the user module loaded at import time such as
+    model weights, is created once in the parent. The parent freezes the
+    garbage collector's view of those objects and then forks. Workers
+    therefore share that memory copy-on-write instead of each loading their
+    own copy. The parent only supervises: it restarts workers that crash and
+    forwards shutdown signals.
+    """
+
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Serving with workers > 1 requires a platform that supports os.fork.")
+
+    sock = _bind(host, port)
+    gc.collect()
+    gc.freeze()
+
+    def spawn() -> int:
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            code = 0
+            try:
+                _run_worker(app, sock, log_level)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        return pid
+
+    children: Dict[int, float] = {}
+    for _ in range(workers):
+        children[spawn()] = time.monotonic()
+
+    stopping = False
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    previous: Dict[int, Callable] = {
+        signum: signal.signal(signum, stop) for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = children.pop(pid, None)
+            if stopping or started is None or os.waitstatus_to_exitcode(status) == 0:
+                continue
+            print(f"ChaiLab worker {pid} exited unexpectedly; restarting.")
+            if time.monotonic() - started < _RESPAWN_DELAY:
+                time.sleep(_RESPAWN_DELAY)
+            children[spawn()] = time.monotonic()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+        sock.close()
+        gc.unfreeze()
+
+
+__all__ = ["serve_prefork"]
@@ -0,0 +1,135 @@
+"""Server-held chat sessions so clients only send the newest message."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .windowing import WindowState
+
+Message = Dict[str, Any]
+
+# Rough per-message bookkeeping cost on top of the content itself.
+_MESSAGE_OVERHEAD = 200
+
+
+def _message_size(message: Message) -> int:
+    content = message.get("content")
+    return _MESSAGE_OVERHEAD + (len(content) if isinstance(content, str) else len(repr(content)))
+
+
+@dataclass
+class ChatSession:
+    """History of one conversation plus the lock that serialises its turns.
+
+    ``window`` is the chat interface's history window state, advanced
+    turn by turn as messages are appended.
+    """
+
+    id: str
+    history: List[Message] = field(default_factory=list)
+    size: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    window: Optional[WindowState] = None
+
+    def append(self, *messages: Message) -> None:
+        for message in messages:
+            self.history.append(message)
+            self.size += _message_size(message)
+
+    def replace(self, history: List[Message]) -> None:
+        self.history = []
+        self.size = 0
+        self.window = None
+        self.append(*history)
+
+
+class SessionStore:
+    """In-memory sessions evicted by idle time and a memory budget.
+
+    Args:
+        ttl: Seconds a session may stay idle before it is dropped.
+        max_sessions: Upper bound on the number of live sessions.
+        max_bytes: Approximate budget for all stored history. Least
+            recently used sessions are evicted first.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: Optional[float] = 3600.0,
+        max_sessions: Optional[int] = 10_000,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+    ) -> None:
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Return a live session and mark it as recently used."""
+
+        self._evict()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def create(self, session_id: Optional[str] = None, history: Optional[List[Message]] = None) -> ChatSession:
+        session = ChatSession(id=session_id or self.new_id())
+        session.replace(list(history or []))
+        self.discard(session.id)
+        self._sessions[session.id] = session
+        self._bytes += session.size
+        self._evict(keep=session.id)
+        return session
+
+    def record(self, session: ChatSession, *messages: Message) -> None:
+        """Append ``messages`` to ``session`` and enforce the memory budget."""
+
+        before = session.size
+        session.append(*messages)
+        if self._sessions.get(session.id) is session:
+            self._bytes += session.size - before
+            self._evict(keep=session.id)
+
+    def discard(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._bytes -= session.size
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sessions": len(self._sessions), "bytes": self._bytes}
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session_id == keep:
+                break
+            expired = self.ttl is not None and now - session.last_used > self.ttl
+            over_count = self.max_sessions is not None and len(self._sessions) > self.max_sessions
+            over_budget = self.max_bytes is not None and self._bytes > self.max_bytes
+            if not (expired or over_count or over_budget):
+                break
+            self.discard(session_id)
+
+
+__all__ = ["ChatSession", "SessionStore"]
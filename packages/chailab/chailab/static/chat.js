@@ -0,0 +1,44 @@
+(function(){'use strict';const h=React.createElement;function readConfig(){const element=document.getElementById('chailab-config');return JSON.parse(element.textContent);}
+function cx(...classes){return classes.filter(Boolean).join(' ');}
+async function postJSON(url,body,signal,headers={}){const response=await fetch(url,{method:'POST',headers:{'Content-Type':'application/json',...headers},body:JSON.stringify(body),signal,});return response;}
+const FRAME_STREAM_TYPE='application/x-chailab-frames';const FRAME_ARRAYS={bool:Uint8Array,int8:Int8Array,uint8:Uint8Array,int16:Int16Array,uint16:Uint16Array,int32:Int32Array,uint32:Uint32Array,int64:BigInt64Array,uint64:BigUint64Array,float32:Float32Array,float64:Float64Array,};function decodeFrame(buffer){const view=new DataView(buffer);const magic=String.fromCharCode(...new Uint8Array(buffer,0,4));if(magic!=='CLF1')throw new Error('Not a ChaiLab frame');const length=view.getUint32(4,true);const header=JSON.parse(new TextDecoder().decode(new Uint8Array(buffer,8,length)));const base=Math.ceil((8+length)/8)*8;const restore=(value)=>{if(Array.isArray(value))return value.map(restore);if(value===null||typeof value!=='object')return value;if('__array__'in value){const[offset,nbytes]=header.buffers[value.__array__];const ArrayType=FRAME_ARRAYS[value.dtype];const array=new ArrayType(buffer,base+offset,nbytes/ArrayType.BYTES_PER_ELEMENT);array.shape=value.shape;return array;}
+return Object.fromEntries(Object.entries(value).map(([key,item])=>[key,restore(item)]));};return restore(header.body);}
+async function readFrames(response,onEvent){const reader=response.body.getReader();let pending=new Uint8Array(0);while(true){const{value,done}=await reader.read();if(done)break;const joined=new Uint8Array(pending.length+value.length);joined.set(pending);joined.set(value,pending.length);pending=joined;while(pending.length>=4){const length=new DataView(pending.buffer,pending.byteOffset,4).getUint32(0,true);if(pending.length<4+length)break;onEvent(decodeFrame(pending.slice(4,4+length).buffer));pending=pending.subarray(4+length);}}}
+async function readEvents(response,onEvent){const reader=response.body.getReader();const decoder=new TextDecoder();let buffer='';while(true){const{value,done}=await reader.read();if(done)break;buffer+=decoder.decode(value,{stream:true});const lines=buffer.split('\n');buffer=lines.pop();lines.filter((line)=>line.trim()).forEach((line)=>onEvent(JSON.parse(line)));}
+if(buffer.trim())onEvent(JSON.parse(buffer));}
+const TERMINAL_EVENTS=new Set(['done','error','cancelled']);function createSocket(path){if(typeof WebSocket==='undefined')return null;const calls=new Map();let opening=null;let nextId=1;const connect=()=>{if(opening)return opening;opening=new Promise((resolve,reject)=>{const url=new URL(path,window.location.href);url.protocol=url.protocol==='https:'?'wss:':'ws:';const socket=new WebSocket(url);socket.binaryType='arraybuffer';socket.onopen=()=>resolve(socket);socket.onerror=()=>reject(new Error('WebSocket connection failed'));socket.onclose=()=>{opening=null;calls.forEach((onEvent)=>onEvent({type:'error',error:'Connection closed'}));calls.clear();};socket.onmessage=(message)=>{const event=typeof message.data==='string'?JSON.parse(message.data):decodeFrame(message.data);const onEvent=calls.get(event.id);if(!onEvent)return;if(TERMINAL_EVENTS.has(event.type))calls.delete(event.id);onEvent(event);};});opening.catch(()=>{opening=null;});return opening;};return{connect,async call(payload,onEvent,signal){const socket=await connect();if(signal&&signal.aborted)return{type:'cancelled'};const id=nextId++;return new Promise((resolve)=>{calls.set(id,(event)=>{onEvent(event);if(TERMINAL_EVENTS.has(event.type))resolve(event);});if(signal){signal.addEventListener('abort',()=>{if(calls.has(id))socket.send(JSON.stringify({id,type:'cancel'}));},{once:true});}
+socket.send(JSON.stringify({...payload,id}));});},};}
+const chailabSocket=createSocket('ws');let socketUnavailable=chailabSocket===null;async function streamEvents(httpUrl,payload,onEvent,signal,{binary=false}={}){if(!socketUnavailable){try{await chailabSocket.connect();}catch(err){socketUnavailable=true;}
+if(!socketUnavailable)return chailabSocket.call(binary?{...payload,binary}:payload,onEvent,signal);}
+let last={type:'done'};const track=(event)=>{if(TERMINAL_EVENTS.has(event.type))last=event;onEvent(event);};const response=await postJSON(httpUrl,payload,signal,binary?{Accept:FRAME_STREAM_TYPE}:{});if(!response.ok||!response.body){const data=await response.json();track({...data,type:'error',error:data.error||'Unknown error',status:response.status});return last;}
+const framed=(response.headers.get('Content-Type')||'').startsWith(FRAME_STREAM_TYPE);await(framed?readFrames:readEvents)(response,track);return last;}
+function mount(App){const root=ReactDOM.createRoot(document.getElementById('app'));root.render(h(App));}
+const chatConfig=readConfig();const HISTORY_KEY='chailab_chat_history';const SESSION_KEY='chailab_chat_session';const SERVER_HISTORY=Boolean(chatConfig.store);const LOCAL_HISTORY=Boolean(chatConfig.save_history)&&!SERVER_HISTORY;const KEEP_SESSION=LOCAL_HISTORY||SERVER_HISTORY;const PAGE_SIZE=50;const BUTTON_CLASSES='inline-flex items-center justify-center whitespace-nowrap rounded-md bg-primary px-4 py-2 text-sm font-medium text-primary-foreground transition-colors hover:bg-primary/90 focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50';const DB_NAME='chailab_chat';const MESSAGES='messages';let historyDB=null;function idbResult(request){return new Promise((resolve,reject)=>{request.onsuccess=()=>resolve(request.result);request.onerror=()=>reject(request.error);});}
+function openHistoryDB(){if(historyDB===null){const request=window.indexedDB.open(DB_NAME,1);request.onupgradeneeded=()=>{request.result.createObjectStore(MESSAGES,{keyPath:['session','seq']});};historyDB=idbResult(request);}
+return historyDB;}
+function sessionRange(sessionId,start=0,end=Infinity){return IDBKeyRange.bound([sessionId,start],[sessionId,end],false,true);}
+async function messageStore(mode){const db=await openHistoryDB();return db.transaction(MESSAGES,mode).objectStore(MESSAGES);}
+async function appendLocal(sessionId,seq,messages){const store=await messageStore('readwrite');messages.forEach(({role,content},index)=>{store.put({session:sessionId,seq:seq+index,role,content});});return new Promise((resolve,reject)=>{store.transaction.oncomplete=resolve;store.transaction.onerror=()=>reject(store.transaction.error);});}
+async function readLocal(sessionId,start,end){const records=await idbResult((await messageStore('readonly')).getAll(sessionRange(sessionId,start,end)));return records.map(({role,content})=>({role,content}));}
+async function localPage(sessionId,before){let end=before;if(end==null){const last=await idbResult((await messageStore('readonly')).openCursor(sessionRange(sessionId),'prev'));end=last?last.value.seq+1:0;}
+const start=Math.max(0,end-PAGE_SIZE);return{start,messages:await readLocal(sessionId,start,end)};}
+async function deleteLocal(sessionId){await idbResult((await messageStore('readwrite')).delete(sessionRange(sessionId)));}
+async function migrateLocalStorage(sessionId){const raw=window.localStorage.getItem(HISTORY_KEY);if(!raw)return;const parsed=JSON.parse(raw);if(Array.isArray(parsed)&&parsed.length)await appendLocal(sessionId,0,parsed);window.localStorage.removeItem(HISTORY_KEY);}
+function newSessionId(){if(window.crypto&&window.crypto.randomUUID)return window.crypto.randomUUID();return`${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;}
+function loadSessionId(){if(!KEEP_SESSION)return newSessionId();try{const stored=window.localStorage.getItem(SESSION_KEY);if(stored)return stored;const created=newSessionId();window.localStorage.setItem(SESSION_KEY,created);return created;}catch(err){return newSessionId();}}
+function persistSessionId(sessionId){if(!KEEP_SESSION)return;try{window.localStorage.setItem(SESSION_KEY,sessionId);}catch(err){console.warn('Failed to persist chat session:',err);}}
+async function fetchPage(sessionId,before){const params=new URLSearchParams({limit:String(PAGE_SIZE)});if(before!=null)params.set('before',String(before));const response=await fetch(`api/chat/session/${encodeURIComponent(sessionId)}/messages?${params}`);if(!response.ok)throw new Error(`Request failed (${response.status})`);return response.json();}
+const loadPage=SERVER_HISTORY?fetchPage:LOCAL_HISTORY?localPage:null;async function sendTurn(sessionId,message,seedHistory,turns,onEvent,signal){const turn={type:'chat',message,session_id:sessionId};const last=await streamEvents('api/chat/stream',{...turn,turns},(event)=>{if(!event.session_expired)onEvent(event);},signal);if(!last.session_expired)return last;return streamEvents('api/chat/stream',{...turn,history:await seedHistory()},onEvent,signal);}
+function applyChunk(text,event){if(event.offset==null)return text+event.content;let end=0;for(let kept=0;kept<event.offset&&end<text.length;kept+=1){end+=text.codePointAt(end)>0xffff?2:1;}
+return text.slice(0,end)+event.content;}
+const ChatMessage=React.memo(function ChatMessage({entry}){const isUser=entry.role==='user';return h('div',{className:cx('flex',isUser?'justify-end':'justify-start')},h('div',{className:cx('max-w-[80%] rounded-lg px-3 py-2 text-sm shadow-sm',isUser?'bg-primary text-primary-foreground':'bg-secondary text-secondary-foreground',),},entry.content),);});const ESTIMATED_ROW_HEIGHT=56;const OVERSCAN_PX=600;const FOLLOW_THRESHOLD_PX=48;const MessageRow=React.memo(function MessageRow({index,entry,observer}){const ref=React.useRef(null);React.useLayoutEffect(()=>{const node=ref.current;observer.observe(node);return()=>observer.unobserve(node);},[observer]);return h('div',{ref,'data-index':index,className:'pb-3'},h(ChatMessage,{entry}));});function rowAt(offsets,value){let low=0;let high=offsets.length-2;while(low<high){const mid=(low+high)>>1;if(offsets[mid+1]<=value)low=mid+1;else high=mid;}
+return low;}
+function MessageList({history,base=0,onReachTop,tail,empty}){const containerRef=React.useRef(null);const heightsRef=React.useRef(new Map());const followRef=React.useRef(true);const anchorRef=React.useRef(null);const[viewport,setViewport]=React.useState({top:0,height:420});const[measured,setMeasured]=React.useState(0);const observer=React.useMemo(()=>new ResizeObserver((entries)=>{let changed=false;for(const item of entries){const index=Number(item.target.dataset.index);const height=item.target.offsetHeight;if(heightsRef.current.get(index)!==height){heightsRef.current.set(index,height);changed=true;}}
+if(changed)setMeasured((count)=>count+1);}),[]);React.useEffect(()=>()=>observer.disconnect(),[observer]);const offsets=React.useMemo(()=>{const heights=heightsRef.current;const result=new Array(history.length+1);result[0]=0;for(let index=0;index<history.length;index+=1){result[index+1]=result[index]+(heights.get(base+index)??ESTIMATED_ROW_HEIGHT);}
+return result;},[history.length,base,measured]);const onScroll=()=>{const node=containerRef.current;followRef.current=node.scrollHeight-node.scrollTop-node.clientHeight<=FOLLOW_THRESHOLD_PX;if(history.length){const row=rowAt(offsets,node.scrollTop);anchorRef.current={index:base+row,delta:node.scrollTop-offsets[row]};}
+setViewport({top:node.scrollTop,height:node.clientHeight});if(onReachTop&&node.scrollTop<OVERSCAN_PX)onReachTop();};React.useLayoutEffect(()=>{const last=history[history.length-1];if(last&&last.role==='user')followRef.current=true;},[history.length]);React.useLayoutEffect(()=>{const node=containerRef.current;if(!node)return;if(followRef.current){node.scrollTop=node.scrollHeight;return;}
+const anchor=anchorRef.current;const row=anchor?anchor.index-base:-1;if(row<0||row>=history.length)return;const top=offsets[row]+anchor.delta;if(Math.abs(node.scrollTop-top)>=1)node.scrollTop=top;});const start=history.length?rowAt(offsets,Math.max(0,viewport.top-OVERSCAN_PX)):0;const end=history.length?rowAt(offsets,viewport.top+viewport.height+OVERSCAN_PX)+1:0;const rows=[];for(let index=start;index<end;index+=1){rows.push(h(MessageRow,{key:base+index,index:base+index,entry:history[index],observer}));}
+return h('div',{ref:containerRef,onScroll,className:'h-[420px] overflow-y-auto bg-muted/40 px-6 py-4',},history.length===0&&empty?empty:null,h('div',{style:{height:offsets[start]}}),rows,h('div',{style:{height:offsets[history.length]-offsets[end]}}),h('div',{className:'flex flex-col gap-3'},tail),);}
+function TypingIndicator({queuePosition}){const dot=(delay)=>h('span',{className:cx('size-2 animate-bounce rounded-full bg-secondary-foreground',delay),});return h('div',{className:'flex justify-start'},h('div',{className:'flex items-center gap-1 rounded-lg bg-secondary px-3 py-2 text-sm text-secondary-foreground'},queuePosition?h('span',{className:'mr-1'},`Queued (#${queuePosition})`):null,dot(null),dot('[animation-delay:150ms]'),dot('[animation-delay:300ms]'),),);}
+function App(){const[history,setHistory]=React.useState([]);const[historyStart,setHistoryStart]=React.useState(0);const[historyReady,setHistoryReady]=React.useState(loadPage===null);const[message,setMessage]=React.useState('');const[isLoading,setIsLoading]=React.useState(false);const[error,setError]=React.useState(null);const[streamingText,setStreamingText]=React.useState(null);const[queuePosition,setQueuePosition]=React.useState(0);const sessionRef=React.useRef(null);const abortRef=React.useRef(null);const loadingOlderRef=React.useRef(false);if(sessionRef.current===null)sessionRef.current=loadSessionId();React.useEffect(()=>{if(loadPage===null)return;const sessionId=sessionRef.current;const migrated=LOCAL_HISTORY?migrateLocalStorage(sessionId):Promise.resolve();migrated.then(()=>loadPage(sessionId)).then((page)=>{if(sessionRef.current!==sessionId)return;setHistory(page.messages);setHistoryStart(page.start);}).catch((err)=>{console.warn('Failed to load chat history:',err);}).finally(()=>setHistoryReady(true));},[]);const loadOlder=async()=>{if(loadPage===null||historyStart===0||loadingOlderRef.current)return;const sessionId=sessionRef.current;loadingOlderRef.current=true;try{const page=await loadPage(sessionId,historyStart);if(sessionRef.current!==sessionId)return;setHistory((current)=>[...page.messages,...current]);setHistoryStart(page.start);}catch(err){console.warn('Failed to load earlier messages:',err);}finally{loadingOlderRef.current=false;}};const saveMessages=(sessionId,seq,...messages)=>{if(!LOCAL_HISTORY)return;appendLocal(sessionId,seq,messages).catch((err)=>{console.warn('Failed to persist chat history:',err);});};const sendMessage=async()=>{if(!message.trim()||!historyReady)return;const turns=historyStart+history.length;const sessionId=sessionRef.current;const nextHistory=[...history,{role:'user',content:message}];setHistory(nextHistory);saveMessages(sessionId,turns,nextHistory[nextHistory.length-1]);setMessage('');setIsLoading(true);setStreamingText('');setError(null);let partial='';const keepPartial=()=>{const reply={role:'assistant',content:partial};setHistory([...nextHistory,reply]);saveMessages(sessionId,turns+1,reply);};const controller=new AbortController();abortRef.current=controller;try{const seedHistory=()=>(LOCAL_HISTORY&&historyStart>0?readLocal(sessionId,0,turns):Promise.resolve(history));const last=await sendTurn(sessionId,message,seedHistory,turns,(event)=>{if(event.type==='queue'){setQueuePosition(event.position);}else if(event.type==='chunk'){setQueuePosition(0);partial=applyChunk(partial,event);setStreamingText(partial);}else if(event.type==='done'){const reply={role:'assistant',content:event.message};setHistory([...nextHistory,reply]);saveMessages(sessionId,turns+1,reply);}else if(event.type==='error'){setError(event.error||'Unknown error');}},controller.signal);if(last.type==='cancelled')keepPartial();}catch(err){if(err.name==='AbortError'){keepPartial();}else{setError(err.message);}}finally{abortRef.current=null;setIsLoading(false);setStreamingText(null);setQueuePosition(0);}};const handleStop=()=>{if(abortRef.current)abortRef.current.abort();};const handleSubmit=(event)=>{event.preventDefault();sendMessage();};const handleClear=()=>{const sessionId=sessionRef.current;fetch(`api/chat/session/${encodeURIComponent(sessionId)}`,{method:'DELETE'}).catch(()=>{});if(LOCAL_HISTORY)deleteLocal(sessionId).catch(()=>{});sessionRef.current=newSessionId();persistSessionId(sessionRef.current);setHistory([]);setHistoryStart(0);};return h('div',{className:'space-y-4'},h('div',{className:'rounded-lg border bg-card text-card-foreground shadow-sm'},h('div',{className:'border-b px-6 py-4'},h('div',{className:'flex items-start justify-between'},h('div',null,h('h1',{className:'text-2xl font-semibold'},chatConfig.title),chatConfig.description?h('p',{className:'text-sm text-muted-foreground'},chatConfig.description):null,),h('button',{type:'button',onClick:handleClear,className:'text-sm text-muted-foreground hover:text-foreground',},'Clear'),),),h(MessageList,{history,base:historyStart,onReachTop:loadOlder,empty:isLoading?null:h('div',{className:'flex h-full items-center justify-center text-sm text-muted-foreground'},'Start the conversation by sending a message.'),tail:[streamingText?h(ChatMessage,{key:'streaming',entry:{role:'assistant',content:streamingText}}):null,isLoading&&!streamingText?h(TypingIndicator,{key:'typing',queuePosition}):null,],}),h('form',{onSubmit:handleSubmit,className:'border-t bg-card px-6 py-4'},h('div',{className:'flex items-center gap-2'},h('textarea',{value:message,onChange:(event)=>setMessage(event.target.value),placeholder:chatConfig.placeholder,autoFocus:chatConfig.autofocus,rows:1,className:'flex-grow resize-none rounded-md border border-input bg-background px-3 py-2 text-sm shadow-sm focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2',}),isLoading?h('button',{type:'button',onClick:handleStop,className:BUTTON_CLASSES},'Stop'):h('button',{type:'submit',disabled:!message.trim()||!historyReady,className:BUTTON_CLASSES,},'Send'),),error?h('p',{className:'mt-2 text-sm text-destructive'},error):null,),),);}
+mount(App);})();
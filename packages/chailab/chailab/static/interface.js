@@ -0,0 +1,25 @@
+(function(){'use strict';const h=React.createElement;function readConfig(){const element=document.getElementById('chailab-config');return JSON.parse(element.textContent);}
+function cx(...classes){return classes.filter(Boolean).join(' ');}
+async function postJSON(url,body,signal,headers={}){const response=await fetch(url,{method:'POST',headers:{'Content-Type':'application/json',...headers},body:JSON.stringify(body),signal,});return response;}
+const FRAME_STREAM_TYPE='application/x-chailab-frames';const FRAME_ARRAYS={bool:Uint8Array,int8:Int8Array,uint8:Uint8Array,int16:Int16Array,uint16:Uint16Array,int32:Int32Array,uint32:Uint32Array,int64:BigInt64Array,uint64:BigUint64Array,float32:Float32Array,float64:Float64Array,};function decodeFrame(buffer){const view=new DataView(buffer);const magic=String.fromCharCode(...new Uint8Array(buffer,0,4));if(magic!=='CLF1')throw new Error('Not a ChaiLab frame');const length=view.getUint32(4,true);const header=JSON.parse(new TextDecoder().decode(new Uint8Array(buffer,8,length)));const base=Math.ceil((8+length)/8)*8;const restore=(value)=>{if(Array.isArray(value))return value.map(restore);if(value===null||typeof value!=='object')return value;if('__array__'in value){const[offset,nbytes]=header.buffers[value.__array__];const ArrayType=FRAME_ARRAYS[value.dtype];const array=new ArrayType(buffer,base+offset,nbytes/ArrayType.BYTES_PER_ELEMENT);array.shape=value.shape;return array;}
+return Object.fromEntries(Object.entries(value).map(([key,item])=>[key,restore(item)]));};return restore(header.body);}
+async function readFrames(response,onEvent){const reader=response.body.getReader();let pending=new Uint8Array(0);while(true){const{value,done}=await reader.read();if(done)break;const joined=new Uint8Array(pending.length+value.length);joined.set(pending);joined.set(value,pending.length);pending=joined;while(pending.length>=4){const length=new DataView(pending.buffer,pending.byteOffset,4).getUint32(0,true);if(pending.length<4+length)break;onEvent(decodeFrame(pending.slice(4,4+length).buffer));pending=pending.subarray(4+length);}}}
+async function readEvents(response,onEvent){const reader=response.body.getReader();const decoder=new TextDecoder();let buffer='';while(true){const{value,done}=await reader.read();if(done)break;buffer+=decoder.decode(value,{stream:true});const lines=buffer.split('\n');buffer=lines.pop();lines.filter((line)=>line.trim()).forEach((line)=>onEvent(JSON.parse(line)));}
+if(buffer.trim())onEvent(JSON.parse(buffer));}
+const TERMINAL_EVENTS=new Set(['done','error','cancelled']);function createSocket(path){if(typeof WebSocket==='undefined')return null;const calls=new Map();let opening=null;let nextId=1;const connect=()=>{if(opening)return opening;opening=new Promise((resolve,reject)=>{const url=new URL(path,window.location.href);url.protocol=url.protocol==='https:'?'wss:':'ws:';const socket=new WebSocket(url);socket.binaryType='arraybuffer';socket.onopen=()=>resolve(socket);socket.onerror=()=>reject(new Error('WebSocket connection failed'));socket.onclose=()=>{opening=null;calls.forEach((onEvent)=>onEvent({type:'error',error:'Connection closed'}));calls.clear();};socket.onmessage=(message)=>{const event=typeof message.data==='string'?JSON.parse(message.data):decodeFrame(message.data);const onEvent=calls.get(event.id);if(!onEvent)return;if(TERMINAL_EVENTS.has(event.type))calls.delete(event.id);onEvent(event);};});opening.catch(()=>{opening=null;});return opening;};return{connect,async call(payload,onEvent,signal){const socket=await connect();if(signal&&signal.aborted)return{type:'cancelled'};const id=nextId++;return new Promise((resolve)=>{calls.set(id,(event)=>{onEvent(event);if(TERMINAL_EVENTS.has(event.type))resolve(event);});if(signal){signal.addEventListener('abort',()=>{if(calls.has(id))socket.send(JSON.stringify({id,type:'cancel'}));},{once:true});}
+socket.send(JSON.stringify({...payload,id}));});},};}
+const chailabSocket=createSocket('ws');let socketUnavailable=chailabSocket===null;async function streamEvents(httpUrl,payload,onEvent,signal,{binary=false}={}){if(!socketUnavailable){try{await chailabSocket.connect();}catch(err){socketUnavailable=true;}
+if(!socketUnavailable)return chailabSocket.call(binary?{...payload,binary}:payload,onEvent,signal);}
+let last={type:'done'};const track=(event)=>{if(TERMINAL_EVENTS.has(event.type))last=event;onEvent(event);};const response=await postJSON(httpUrl,payload,signal,binary?{Accept:FRAME_STREAM_TYPE}:{});if(!response.ok||!response.body){const data=await response.json();track({...data,type:'error',error:data.error||'Unknown error',status:response.status});return last;}
+const framed=(response.headers.get('Content-Type')||'').startsWith(FRAME_STREAM_TYPE);await(framed?readFrames:readEvents)(response,track);return last;}
+function mount(App){const root=ReactDOM.createRoot(document.getElementById('app'));root.render(h(App));}
+const interfaceConfig=readConfig();const BUTTON_CLASSES='inline-flex items-center justify-center whitespace-nowrap rounded-md bg-primary px-4 py-2 text-sm font-medium text-primary-foreground transition-colors hover:bg-primary/90 focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50';const LABEL_CLASSES='text-sm font-medium leading-none peer-disabled:cursor-not-allowed peer-disabled:opacity-70';function useInitialInputState(){const state={};interfaceConfig.components.inputs.forEach((config)=>{if(config.type==='slider'){const value=Array.isArray(config.props.value)?config.props.value[0]:(config.props.value??config.props.min??0);state[config.id]=value;}else{state[config.id]=config.props.value??'';}});return state;}
+function InputComponent({config,value,onChange}){if(config.type==='input'){return h('div',{className:'space-y-2'},h('label',{className:LABEL_CLASSES},config.label),h('input',{type:config.props.type||'text',placeholder:config.props.placeholder||'',value,disabled:config.props.disabled,className:'flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm ring-offset-background placeholder:text-muted-foreground focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50',onChange:(event)=>onChange(event.target.value),}),config.props.error?h('p',{className:'text-sm text-destructive'},config.props.error):null,);}
+if(config.type==='slider'){return h('div',{className:'space-y-4'},h('div',{className:'flex items-center justify-between'},h('label',{className:LABEL_CLASSES},config.label),h('span',{className:'text-sm text-muted-foreground'},value),),h('input',{type:'range',min:config.props.min??0,max:config.props.max??100,step:config.props.step??1,value,disabled:config.props.disabled,onChange:(event)=>onChange(parseFloat(event.target.value)),className:'w-full h-2 rounded-lg bg-secondary',}),);}
+return h('div',{className:'space-y-2'},h('label',{className:'text-sm font-medium leading-none'},config.label),h('div',{className:'text-sm text-muted-foreground'},'Unsupported input: ',config.type),);}
+const ARRAY_PREVIEW=8;function formatOutput(value){if(value===null||value===undefined||typeof value!=='object')return value;if(ArrayBuffer.isView(value)){const shape=value.shape?value.shape.join('×'):value.length;const items=Array.from(value.subarray(0,ARRAY_PREVIEW),String).join(', ');return`${value.constructor.name}(${shape}) [${items}${value.length > ARRAY_PREVIEW ? ', …' : ''}]`;}
+return JSON.stringify(value);}
+function OutputComponent({config,value}){return h('div',{className:'space-y-2'},h('label',{className:LABEL_CLASSES},config.label),h('div',{className:'flex min-h-[40px] w-full items-center rounded-md border border-input bg-muted px-3 py-2 text-sm ring-offset-background'},formatOutput(value)??config.props.placeholder??'Output will appear here',),);}
+function progressLabel(progress){if(!progress)return'';const fraction=progress.total?progress.progress/progress.total:progress.progress;const amount=` ${Math.round(fraction * 100)}%`;return progress.desc?` ${progress.desc}${amount}`:amount;}
+function App(){const[inputValues,setInputValues]=React.useState(()=>useInitialInputState());const[outputs,setOutputs]=React.useState([]);const[isLoading,setIsLoading]=React.useState(false);const[error,setError]=React.useState(null);const[queuePosition,setQueuePosition]=React.useState(0);const[progress,setProgress]=React.useState(null);const handleChange=(id,nextValue)=>{setInputValues((prev)=>({...prev,[id]:nextValue}));};const handleSubmit=async()=>{const payload=interfaceConfig.components.inputs.map((config)=>inputValues[config.id]);setIsLoading(true);setError(null);try{await streamEvents('api/predict/stream',{type:'predict',inputs:payload},(event)=>{if(event.type==='queue'){setQueuePosition(event.position);}else if(event.type==='progress'){setQueuePosition(0);setProgress(event);}else if(event.type==='outputs'){setQueuePosition(0);setOutputs(event.outputs);}else if(event.type==='error'){setError(event.error||'Unknown error');}},undefined,{binary:true});}catch(err){setError(err.message);}finally{setIsLoading(false);setQueuePosition(0);setProgress(null);}};return h('div',{className:'space-y-6'},h('div',{className:'rounded-lg border bg-card text-card-foreground shadow-sm p-6 space-y-6'},h('div',{className:'space-y-2'},h('h1',{className:'text-2xl font-semibold'},interfaceConfig.title),interfaceConfig.description?h('p',{className:'text-muted-foreground'},interfaceConfig.description):null,),h('div',{className:'grid grid-cols-1 gap-6 md:grid-cols-2'},h('div',{className:'space-y-4'},h('h3',{className:'text-lg font-medium'},'Inputs'),interfaceConfig.components.inputs.map((config)=>h(InputComponent,{key:config.id,config,value:inputValues[config.id],onChange:(value)=>handleChange(config.id,value),})),),h('div',{className:'space-y-4'},h('h3',{className:'text-lg font-medium'},'Outputs'),interfaceConfig.components.outputs.map((config,index)=>h(OutputComponent,{key:config.id,config,value:outputs[index],})),),),h('div',{className:'flex items-center justify-between'},error?h('p',{className:'text-sm text-destructive'},error):h('span'),h('button',{onClick:handleSubmit,disabled:isLoading,className:BUTTON_CLASSES},queuePosition?`Queued (#${queuePosition})…`:isLoading?`Running${progressLabel(progress)}…`:'Submit',),),),);}
+mount(App);})();
@@ -0,0 +1,155 @@
+"""History windows that bound how much of a conversation a chat fn sees."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+Message = Dict[str, Any]
+Tokenizer = Callable[[str], int]
+# ``summarize(summary, messages)`` folds ``messages`` into the previous summary.
+Summarizer = Callable[[Optional[str], List[Message]], Union[str, Awaitable[str]]]
+# Runs a user hook off the event loop and returns its result.
+HookCaller = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class WindowState:
+    """Where a conversation's window stands, kept between turns.
+
+    ``start`` is the first message fn sees and ``seen`` the number of
+    messages already accounted for, so each turn only looks at what was
+    appended since the last one.
+    """
+
+    start: int = 0
+    seen: int = 0
+    costs: Deque[int] = field(default_factory=deque)
+    total: int = 0
+    folded: int = 0
+    summary: Optional[str] = None
+
+
+def _text(message: Message) -> str:
+    content = message.get("content")
+    return content if isinstance(content, str) else repr(content)
+
+
+def _align(state: WindowState, history: List[Message]) -> None:
+    # Never open the window on a reply whose question was dropped.
+    while state.start < len(history) and history[state.start].get("role") != "user":
+        state.start += 1
+        if state.costs:
+            state.total -= state.costs.popleft()
+
+
+class HistoryWindow:
+    """Policy choosing the part of a conversation passed to a chat fn.
+
+    Subclasses implement :meth:`advance`, which only ever moves
+    ``state.start`` forward and looks at messages appended since the
+    previous call.
+    """
+
+    def new_state(self) -> WindowState:
+        return WindowState()
+
+    def advance(self, state: WindowState, history: List[Message]) -> None:
+        raise NotImplementedError
+
+    async def view(self, state: WindowState, history: List[Message], call: HookCaller) -> List[Message]:
+        """Update ``state`` for ``history`` and return copies of the messages fn sees."""
+
+        self.advance(state, history)
+        return [dict(message) for message in history[state.start:]]
+
+
+class LastTurns(HistoryWindow):
+    """Keep the last ``turns`` exchanges (a user message and its reply)."""
+
+    def __init__(self, turns: int) -> None:
+        if turns < 0:
+            raise ValueError("turns must not be negative.")
+        self.turns = turns
+
+    def advance(self, state: WindowState, history: List[Message]) -> None:
+        state.seen = len(history)
+        state.start = max(state.start, len(history) - 2 * self.turns)
+        _align(state, history)
+
+
+class TokenBudget(HistoryWindow):
+    """Keep the newest messages whose combined size fits ``max_tokens``.
+
+    ``tokenizer`` maps message text to a token count; the default counts
+    characters. Each message is measured once, when it first enters the
+    window, and the oldest turns are dropped until the rest fits. A single
+    turn larger than the budget leaves the window empty.
+    """
+
+    def __init__(self, max_tokens: int, tokenizer: Optional[Tokenizer] = None) -> None:
+        if max_tokens < 0:
+            raise ValueError("max_tokens must not be negative.")
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer or len
+
+    def advance(self, state: WindowState, history: List[Message]) -> None:
+        for message in history[state.seen:]:
+            cost = self.tokenizer(_text(message))
+            state.costs.append(cost)
+            state.total += cost
+        state.seen = len(history)
+        while state.total > self.max_tokens and state.costs:
+            state.total -= state.costs.popleft()
+            state.start += 1
+        _align(state, history)
+
+
+class Summarize(HistoryWindow):
+    """Fold turns that fall out of ``keep`` into a running summary.
+
+    ``summarize(summary, messages)`` receives the previous summary (``None``
+    at first) and the newly dropped messages and returns the new summary;
+    it may be a coroutine function. fn then sees the summary as one
+    ``role`` message followed by the kept turns. ``keep`` is another window
+    or a number of turns.
+
+    The summary is cached with the session, so each dropped turn is
+    summarised once. Stateless requests carry no state and summarise their
+    older turns on every request.
+    """
+
+    def __init__(self, summarize: Summarizer, keep: Union[HistoryWindow, int] = 4, *, role: str = "system") -> None:
+        self.summarize = summarize
+        self.keep = history_window(keep)
+        self.role = role
+
+    def advance(self, state: WindowState, history: List[Message]) -> None:
+        self.keep.advance(state, history)
+
+    async def view(self, state: WindowState, history: List[Message], call: HookCaller) -> List[Message]:
+        self.advance(state, history)
+        if state.start > state.folded:
+            # ``folded`` only moves once the hook succeeds, so a failed
+            # summary is retried with the next turn.
+            dropped = [dict(message) for message in history[state.folded:state.start]]
+            state.summary = await call(self.summarize, state.summary, dropped)
+            state.folded = state.start
+        window = [dict(message) for message in history[state.start:]]
+        if state.summary:
+            window.insert(0, {"role": self.role, "content": state.summary})
+        return window
+
+
+def history_window(spec: Union[HistoryWindow, int]) -> HistoryWindow:
+    """Return the window for ``spec``; an int keeps that many turns."""
+
+    if isinstance(spec, HistoryWindow):
+        return spec
+    if isinstance(spec, int) and not isinstance(spec, bool):
+        return LastTurns(spec)
+    raise TypeError(f"Expected a HistoryWindow or a number of turns, got {spec!r}.")
+
+
+__all__ = ["HistoryWindow", "LastTurns", "Summarize", "TokenBudget", "WindowState", "history_window"]
@@ -15,6 +15,7 @@ def slow_echo(message: str, history):
 
 demo = cl.ChatInterface(
     fn=slow_echo,
+    stream_mode="cumulative",
     title="⌛ Slow Echo Chat",
     description="Shows how generator functions can feed incremental responses.",
     placeholder="Type something slowly…",
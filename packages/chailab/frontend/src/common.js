@@ -0,0 +1,206 @@
+// Shared helpers for the ChaiLab built-in frontends.
+//
+// The build script concatenates this file with one entry module inside a
+// single closure, so everything declared here is visible to the entry.
+
+const h = React.createElement;
+
+function readConfig() {
+    const element = document.getElementById('chailab-config');
+    return JSON.parse(element.textContent);
+}
+
+function cx(...classes) {
+    return classes.filter(Boolean).join(' ');
+}
+
+async function postJSON(url, body, signal, headers = {}) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', ...headers },
+        body: JSON.stringify(body),
+        signal,
+    });
+    return response;
+}
+
+// Binary frames (see chailab/frames.py): a JSON header followed by raw
+// little-endian array buffers, each 8-byte aligned so typed arrays can view
+// them in place.
+const FRAME_STREAM_TYPE = 'application/x-chailab-frames';
+const FRAME_ARRAYS = {
+    bool: Uint8Array,
+    int8: Int8Array,
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    int64: BigInt64Array,
+    uint64: BigUint64Array,
+    float32: Float32Array,
+    float64: Float64Array,
+};
+
+// Decode one frame into plain values with typed arrays in place of the
+// encoded arrays. Each typed array carries the original `shape`.
+function decodeFrame(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'CLF1') throw new Error('Not a ChaiLab frame');
+    const length = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, length)));
+    const base = Math.ceil((8 + length) / 8) * 8;
+    const restore = (value) => {
+        if (Array.isArray(value)) return value.map(restore);
+        if (value === null || typeof value !== 'object') return value;
+        if ('__array__' in value) {
+            const [offset, nbytes] = header.buffers[value.__array__];
+            const ArrayType = FRAME_ARRAYS[value.dtype];
+            const array = new ArrayType(buffer, base + offset, nbytes / ArrayType.BYTES_PER_ELEMENT);
+            array.shape = value.shape;
+            return array;
+        }
+        return Object.fromEntries(Object.entries(value).map(([key, item]) => [key, restore(item)]));
+    };
+    return restore(header.body);
+}
+
+// Read a stream of length-prefixed frames, calling onEvent for each one.
+async function readFrames(response, onEvent) {
+    const reader = response.body.getReader();
+    let pending = new Uint8Array(0);
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        const joined = new Uint8Array(pending.length + value.length);
+        joined.set(pending);
+        joined.set(value, pending.length);
+        pending = joined;
+        while (pending.length >= 4) {
+            const length = new DataView(pending.buffer, pending.byteOffset, 4).getUint32(0, true);
+            if (pending.length < 4 + length) break;
+            // slice() copies the frame into its own, aligned buffer.
+            onEvent(decodeFrame(pending.slice(4, 4 + length).buffer));
+            pending = pending.subarray(4 + length);
+        }
+    }
+}
+
+// Read a newline-delimited JSON response, calling onEvent for every event
+// as soon as its line is complete.
+async function readEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+    }
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
+const TERMINAL_EVENTS = new Set(['done', 'error', 'cancelled']);
+
+// One persistent WebSocket multiplexing calls by id. Every call receives the
+// same events as the HTTP stream endpoints. Returns null when the browser
+// has no WebSocket support.
+function createSocket(path) {
+    if (typeof WebSocket === 'undefined') return null;
+    const calls = new Map();
+    let opening = null;
+    let nextId = 1;
+
+    const connect = () => {
+        if (opening) return opening;
+        opening = new Promise((resolve, reject) => {
+            const url = new URL(path, window.location.href);
+            url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+            const socket = new WebSocket(url);
+            socket.binaryType = 'arraybuffer';
+            socket.onopen = () => resolve(socket);
+            socket.onerror = () => reject(new Error('WebSocket connection failed'));
+            socket.onclose = () => {
+                opening = null;
+                calls.forEach((onEvent) => onEvent({ type: 'error', error: 'Connection closed' }));
+                calls.clear();
+            };
+            socket.onmessage = (message) => {
+                const event = typeof message.data === 'string'
+                    ? JSON.parse(message.data)
+                    : decodeFrame(message.data);
+                const onEvent = calls.get(event.id);
+                if (!onEvent) return;
+                if (TERMINAL_EVENTS.has(event.type)) calls.delete(event.id);
+                onEvent(event);
+            };
+        });
+        opening.catch(() => { opening = null; });
+        return opening;
+    };
+
+    return {
+        connect,
+        async call(payload, onEvent, signal) {
+            const socket = await connect();
+            if (signal && signal.aborted) return { type: 'cancelled' };
+            const id = nextId++;
+            return new Promise((resolve) => {
+                calls.set(id, (event) => {
+                    onEvent(event);
+                    if (TERMINAL_EVENTS.has(event.type)) resolve(event);
+                });
+                if (signal) {
+                    signal.addEventListener('abort', () => {
+                        if (calls.has(id)) socket.send(JSON.stringify({ id, type: 'cancel' }));
+                    }, { once: true });
+                }
+                socket.send(JSON.stringify({ ...payload, id }));
+            });
+        },
+    };
+}
+
+// URLs are relative to the page so an app keeps working when it is mounted
+// under a path prefix.
+const chailabSocket = createSocket('ws');
+let socketUnavailable = chailabSocket === null;
+
+// Run one streamed call, over the shared WebSocket when it can be opened and
+// otherwise as an NDJSON POST to httpUrl. onEvent sees every event; the
+// returned promise resolves with the final done/error/cancelled event. With
+// `binary`, arrays in the events arrive as typed arrays.
+async function streamEvents(httpUrl, payload, onEvent, signal, { binary = false } = {}) {
+    if (!socketUnavailable) {
+        try {
+            await chailabSocket.connect();
+        } catch (err) {
+            socketUnavailable = true;
+        }
+        if (!socketUnavailable) return chailabSocket.call(binary ? { ...payload, binary } : payload, onEvent, signal);
+    }
+
+    let last = { type: 'done' };
+    const track = (event) => {
+        if (TERMINAL_EVENTS.has(event.type)) last = event;
+        onEvent(event);
+    };
+    const response = await postJSON(httpUrl, payload, signal, binary ? { Accept: FRAME_STREAM_TYPE } : {});
+    if (!response.ok || !response.body) {
+        const data = await response.json();
+        track({ ...data, type: 'error', error: data.error || 'Unknown error', status: response.status });
+        return last;
+    }
+    const framed = (response.headers.get('Content-Type') || '').startsWith(FRAME_STREAM_TYPE);
+    await (framed ? readFrames : readEvents)(response, track);
+    return last;
+}
+
+function mount(App) {
+    const root = ReactDOM.createRoot(document.getElementById('app'));
+    root.render(h(App));
+}
@@ -0,0 +1,172 @@
+// Built-in frontend for chailab.Interface.
+
+const interfaceConfig = readConfig();
+
+const BUTTON_CLASSES =
+    'inline-flex items-center justify-center whitespace-nowrap rounded-md bg-primary px-4 py-2 text-sm font-medium text-primary-foreground transition-colors hover:bg-primary/90 focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50';
+const LABEL_CLASSES =
+    'text-sm font-medium leading-none peer-disabled:cursor-not-allowed peer-disabled:opacity-70';
+
+function useInitialInputState() {
+    const state = {};
+    interfaceConfig.components.inputs.forEach((config) => {
+        if (config.type === 'slider') {
+            const value = Array.isArray(config.props.value)
+                ? config.props.value[0]
+                : (config.props.value ?? config.props.min ?? 0);
+            state[config.id] = value;
+        } else {
+            state[config.id] = config.props.value ?? '';
+        }
+    });
+    return state;
+}
+
+function InputComponent({ config, value, onChange }) {
+    if (config.type === 'input') {
+        return h('div', { className: 'space-y-2' },
+            h('label', { className: LABEL_CLASSES }, config.label),
+            h('input', {
+                type: config.props.type || 'text',
+                placeholder: config.props.placeholder || '',
+                value,
+                disabled: config.props.disabled,
+                className: 'flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm ring-offset-background placeholder:text-muted-foreground focus-visible:outline-none focus-visible:ring-2 focus-visible:ring-ring focus-visible:ring-offset-2 disabled:pointer-events-none disabled:opacity-50',
+                onChange: (event) => onChange(event.target.value),
+            }),
+            config.props.error ? h('p', { className: 'text-sm text-destructive' }, config.props.error) : null,
+        );
+    }
+
+    if (config.type === 'slider') {
+        return h('div', { className: 'space-y-4' },
+            h('div', { className: 'flex items-center justify-between' },
+                h('label', { className: LABEL_CLASSES }, config.label),
+                h('span', { className: 'text-sm text-muted-foreground' }, value),
+            ),
+            h('input', {
+                type: 'range',
+                min: config.props.min ?? 0,
+                max: config.props.max ?? 100,
+                step: config.props.step ?? 1,
+                value,
+                disabled: config.props.disabled,
+                onChange: (event) => onChange(parseFloat(event.target.value)),
+                className: 'w-full h-2 rounded-lg bg-secondary',
+            }),
+        );
+    }
+
+    return h('div', { className: 'space-y-2' },
+        h('label', { className: 'text-sm font-medium leading-none' }, config.label),
+        h('div', { className: 'text-sm text-muted-foreground' }, 'Unsupported input: ', config.type),
+    );
+}
+
+const ARRAY_PREVIEW = 8;
+
+// Render outputs that are not plain text: typed arrays from binary frames,
+// lists and objects.
+function formatOutput(value) {
+    if (value === null || value === undefined || typeof value !== 'object') return value;
+    if (ArrayBuffer.isView(value)) {
+        const shape = value.shape ? value.shape.join('×') : value.length;
+        const items = Array.from(value.subarray(0, ARRAY_PREVIEW), String).join(', ');
+        return `${value.constructor.name}(${shape}) [${items}${value.length > ARRAY_PREVIEW ? ', …' : ''}]`;
+    }
+    return JSON.stringify(value);
+}
+
+function OutputComponent({ config, value }) {
+    return h('div', { className: 'space-y-2' },
+        h('label', { className: LABEL_CLASSES }, config.label),
+        h('div', { className: 'flex min-h-[40px] w-full items-center rounded-md border border-input bg-muted px-3 py-2 text-sm ring-offset-background' },
+            formatOutput(value) ?? config.props.placeholder ?? 'Output will appear here',
+        ),
+    );
+}
+
+function progressLabel(progress) {
+    if (!progress) return '';
+    const fraction = progress.total ? progress.progress / progress.total : progress.progress;
+    const amount = ` ${Math.round(fraction * 100)}%`;
+    return progress.desc ? ` ${progress.desc}${amount}` : amount;
+}
+
+function App() {
+    const [inputValues, setInputValues] = React.useState(() => useInitialInputState());
+    const [outputs, setOutputs] = React.useState([]);
+    const [isLoading, setIsLoading] = React.useState(false);
+    const [error, setError] = React.useState(null);
+    const [queuePosition, setQueuePosition] = React.useState(0);
+    const [progress, setProgress] = React.useState(null);
+
+    const handleChange = (id, nextValue) => {
+        setInputValues((prev) => ({ ...prev, [id]: nextValue }));
+    };
+
+    const handleSubmit = async () => {
+        const payload = interfaceConfig.components.inputs.map((config) => inputValues[config.id]);
+        setIsLoading(true);
+        setError(null);
+        try {
+            await streamEvents('api/predict/stream', { type: 'predict', inputs: payload }, (event) => {
+                if (event.type === 'queue') {
+                    setQueuePosition(event.position);
+                } else if (event.type === 'progress') {
+                    setQueuePosition(0);
+                    setProgress(event);
+                } else if (event.type === 'outputs') {
+                    setQueuePosition(0);
+                    setOutputs(event.outputs);
+                } else if (event.type === 'error') {
+                    setError(event.error || 'Unknown error');
+                }
+            }, undefined, { binary: true });
+        } catch (err) {
+            setError(err.message);
+        } finally {
+            setIsLoading(false);
+            setQueuePosition(0);
+            setProgress(null);
+        }
+    };
+
+    return h('div', { className: 'space-y-6' },
+        h('div', { className: 'rounded-lg border bg-card text-card-foreground shadow-sm p-6 space-y-6' },
+            h('div', { className: 'space-y-2' },
+                h('h1', { className: 'text-2xl font-semibold' }, interfaceConfig.title),
+                interfaceConfig.description
+                    ? h('p', { className: 'text-muted-foreground' }, interfaceConfig.description)
+                    : null,
+            ),
+            h('div', { className: 'grid grid-cols-1 gap-6 md:grid-cols-2' },
+                h('div', { className: 'space-y-4' },
+                    h('h3', { className: 'text-lg font-medium' }, 'Inputs'),
+                    interfaceConfig.components.inputs.map((config) => h(InputComponent, {
+                        key: config.id,
+                        config,
+                        value: inputValues[config.id],
+                        onChange: (value) => handleChange(config.id, value),
+                    })),
+                ),
+                h('div', { className: 'space-y-4' },
+                    h('h3', { className: 'text-lg font-medium' }, 'Outputs'),
+                    interfaceConfig.components.outputs.map((config, index) => h(OutputComponent, {
+                        key: config.id,
+                        config,
+                        value: outputs[index],
+                    })),
+                ),
+            ),
+            h('div', { className: 'flex items-center justify-between' },
+                error ? h('p', { className: 'text-sm text-destructive' }, error) : h('span'),
+                h('button', { onClick: handleSubmit, disabled: isLoading, className: BUTTON_CLASSES },
+                    queuePosition ? `Queued (#${queuePosition})…` : isLoading ? `Running${progressLabel(progress)}…` : 'Submit',
+                ),
+            ),
+        ),
+    );
+}
+
+mount(App);
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Build the minified frontend bundles shipped in ``chailab/static``.
+
+Each entry module in ``frontend/src`` is concatenated with ``common.js``,
+wrapped in a single closure and minified. Run this after editing anything
+under ``frontend/src`` and commit the regenerated files::
+
+    uv pip install rjsmin rcssmin
+    python scripts/build_frontend.py
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import rcssmin
+import rjsmin
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = ROOT / "frontend" / "src"
+STATIC_DIR = ROOT / "chailab" / "static"
+
+ENTRIES = ("interface.js", "chat.js")
+STYLESHEETS = ("chailab.css",)
+
+
+def build_script(entry: str) -> str:
+    common = (SOURCE_DIR / "common.js").read_text(encoding="utf-8")
+    module = (SOURCE_DIR / entry).read_text(encoding="utf-8")
+    bundle = "(function () {\n'use strict';\n" + common + "\n" + module + "\n})();\n"
+    return rjsmin.jsmin(bundle) + "\n"
+
+
+def build_stylesheet(name: str) -> str:
+    return rcssmin.cssmin((SOURCE_DIR / name).read_text(encoding="utf-8")) + "\n"
+
+
+def main() -> None:
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    for entry in ENTRIES:
+        output = STATIC_DIR / entry
+        output.write_text(build_script(entry), encoding="utf-8")
+        print(f"Wrote {output.relative_to(ROOT)}")
+    for name in STYLESHEETS:
+        output = STATIC_DIR / name
+        output.write_text(build_stylesheet(name), encoding="utf-8")
+        print(f"Wrote {output.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
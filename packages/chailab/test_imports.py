@@ -3,6 +3,22 @@
 Basic import check for ChaiLab (no emojis, minimal output)
 """
 
+import subprocess
+import sys
+
+# Importing chailab and defining interfaces must not load the web stack.
+IMPORT_CHECK = """
+import sys, time
+start = time.perf_counter()
+import chailab as cl
+imported = time.perf_counter()
+cl.Interface(fn=lambda x: x, inputs="text", outputs="text")
+cl.ChatInterface(lambda message, history: message)
+defined = time.perf_counter()
+heavy = sorted(name for name in ("fastapi", "starlette", "uvicorn", "pydantic") if name in sys.modules)
+print(f"{(imported - start) * 1000:.1f} {(defined - imported) * 1000:.1f} {','.join(heavy)}")
+"""
+
 try:
     import chailab as cl
     print("ChaiLab import: OK")
@@ -16,5 +32,16 @@ try:
     from chailab.ui import Input, Button  # noqa: F401
     print("UI components import: OK")
 
+    result = subprocess.run([sys.executable, "-c", IMPORT_CHECK], capture_output=True, text=True, check=True)
+    import_ms, define_ms, heavy = (result.stdout.split() + [""])[:3]
+    print(f"Import time: {import_ms} ms, interface definition: {define_ms} ms")
+    if heavy:
+        raise RuntimeError(f"Defining interfaces imported {heavy}")
+    print("Lazy web stack: OK")
+
+    demo._create_app()
+    print("App creation: OK")
+
 except Exception as e:
     print(f"Error: {e}")
+    sys.exit(1)
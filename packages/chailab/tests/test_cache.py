@@ -0,0 +1,80 @@
+import pytest
+
+from chailab.cache import ResultCache, canonical_key
+
+
+def render(text):
+    return text
+
+
+def test_equal_inputs_share_a_key():
+    cache = ResultCache()
+    assert cache.key(render, {"a": 1, "b": [1, 2]}) == cache.key(render, {"b": [1, 2], "a": 1})
+    assert cache.key(render, ["x"]) != cache.key(render, ["y"])
+
+
+def test_bytes_are_keyed_by_contents():
+    assert canonical_key("fn", [b"abc"]) != canonical_key("fn", [b"abd"])
+
+
+def test_inputs_without_a_lossless_encoding_have_no_key():
+    assert ResultCache().key(render, [object()]) is None
+
+
+def test_closures_get_their_own_namespace():
+    def make(factor):
+        return lambda value: value * factor
+
+    cache = ResultCache()
+    double, triple = make(2), make(3)
+    assert cache.key(double, [1]) != cache.key(triple, [1])
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("chailab.cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(ttl=10)
+    key = cache.key(render, ["x"])
+    cache.set(key, "X", fn=render)
+    now[0] += 5
+    assert cache.get(key) == "X"
+    now[0] += 6
+    assert cache.get(key) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_hits_keep_their_expiry(tmp_path, monkeypatch):
+    clock = {"wall": 1000.0, "mono": 50.0}
+    monkeypatch.setattr("chailab.cache.time.time", lambda: clock["wall"])
+    monkeypatch.setattr("chailab.cache.time.monotonic", lambda: clock["mono"])
+    cache = ResultCache(ttl=10, disk_path=tmp_path / "cache.sqlite")
+    key = cache.key(render, ["x"])
+    cache.set(key, "X", fn=render)
+
+    fresh = ResultCache(ttl=10, disk_path=tmp_path / "cache.sqlite")
+    clock["wall"] += 8
+    clock["mono"] += 8
+    assert fresh.get(key) == "X"
+    assert fresh.disk_hits == 1
+    clock["wall"] += 3
+    clock["mono"] += 3
+    assert fresh.get(key) is None
+    fresh.close()
+    cache.close()
+
+
+def test_invalidate_drops_one_fn():
+    def other(text):
+        return text
+
+    cache = ResultCache()
+    cache.set(cache.key(render, [1]), "a", fn=render)
+    cache.set(cache.key(other, [1]), "b", fn=other)
+    cache.invalidate(render)
+    assert cache.get(cache.key(render, [1])) is None
+    assert cache.get(cache.key(other, [1])) == "b"
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        ResultCache(max_size=0)
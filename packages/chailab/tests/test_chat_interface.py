@@ -0,0 +1,65 @@
+import pytest
+
+from chailab.blocks import RequestError
+from chailab.chat_interface import ChatInterface
+
+
+def echo(message, history):
+    return message
+
+
+def turn(chat, message, turns):
+    message, history, session = chat._resolve({"session_id": "s1", "message": message, "turns": turns})
+    chat._record_turn(session, message, "re: " + message)
+    return history
+
+
+def expired(chat, **payload):
+    with pytest.raises(RequestError) as info:
+        chat._resolve({"session_id": "s1", "message": "hi", **payload})
+    assert info.value.status_code == 409
+    assert info.value.extra == {"session_expired": True}
+
+
+def test_unknown_session_with_turns_is_409():
+    expired(ChatInterface(fn=echo), turns=2)
+
+
+def test_new_session_starts_empty():
+    chat = ChatInterface(fn=echo)
+    assert turn(chat, "hi", 0) == [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "re: hi"}]
+
+
+def test_session_of_a_different_length_is_409():
+    chat = ChatInterface(fn=echo)
+    turn(chat, "hi", 0)
+    expired(chat, turns=4)
+
+
+def test_evicted_session_is_409_until_history_is_resent():
+    chat = ChatInterface(fn=echo)
+    turn(chat, "hi", 0)
+    chat.sessions.discard("s1")
+    expired(chat, turns=2)
+    seed = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "re: hi"}]
+    _, history, _ = chat._resolve({"session_id": "s1", "message": "again", "history": seed})
+    assert history == seed
+
+
+def test_store_reloads_a_session_moved_on_by_another_worker():
+    first = ChatInterface(fn=echo, store=True)
+    second = ChatInterface(fn=echo, store=first.store)
+    turn(first, "1", 0)
+    turn(second, "2", 2)
+    history = turn(first, "3", 4)
+    assert [item["content"] for item in history] == ["1", "re: 1", "2", "re: 2", "3", "re: 3"]
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"history": "nope"}, {"history": ["bad"]}, {"session_id": "", "message": "hi"}, {"session_id": "s1", "turns": "2"}],
+)
+def test_malformed_requests_are_400(payload):
+    with pytest.raises(RequestError) as info:
+        ChatInterface(fn=echo)._resolve(payload)
+    assert info.value.status_code == 400
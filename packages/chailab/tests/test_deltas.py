@@ -0,0 +1,48 @@
+import pytest
+
+from chailab.deltas import DeltaEncoder, common_prefix_length
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [("", "", 0), ("abc", "", 0), ("abc", "abd", 2), ("abc", "abc", 3), ("abc", "abcdef", 3), ("xyz", "abc", 0)],
+)
+def test_common_prefix_length(a, b, expected):
+    assert common_prefix_length(a, b) == expected
+
+
+def test_delta_mode_passes_chunks_through():
+    encoder = DeltaEncoder("delta")
+    assert encoder.push("Hel") == (None, "Hel")
+    assert encoder.push("") is None
+    assert encoder.push("lo") == (None, "lo")
+    assert encoder.text == "Hello"
+
+
+def test_cumulative_mode_sends_appends_and_patches():
+    encoder = DeltaEncoder("cumulative")
+    assert encoder.push("Hel") == (None, "Hel")
+    assert encoder.push("Hello") == (None, "lo")
+    assert encoder.push("Hello") is None
+    assert encoder.push("Help!") == (3, "p!")
+    assert encoder.text == "Help!"
+
+
+def test_auto_mode_detects_cumulative_yields():
+    encoder = DeltaEncoder("auto")
+    encoder.push("a")
+    assert encoder.push("ab") == (None, "b")
+    assert encoder.mode == "cumulative"
+
+
+def test_auto_mode_detects_delta_yields():
+    encoder = DeltaEncoder("auto")
+    encoder.push("a")
+    assert encoder.push("b") == (None, "b")
+    assert encoder.mode == "delta"
+    assert encoder.text == "ab"
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        DeltaEncoder("diff")
@@ -0,0 +1,35 @@
+import pytest
+
+from chailab import frames
+from chailab.codec import Codec
+
+np = pytest.importorskip("numpy")
+
+
+def test_round_trip_restores_arrays():
+    codec = Codec()
+    value = {
+        "image": np.arange(12, dtype=np.float32).reshape(3, 4),
+        "labels": ["a", "b"],
+        "mask": np.array([1, 0, 1], dtype=np.uint8),
+    }
+    data = frames.encode(value, codec)
+    assert data[:4] == frames.MAGIC
+
+    decoded = frames.decode(data, codec)
+    assert decoded["labels"] == ["a", "b"]
+    for name in ("image", "mask"):
+        assert decoded[name].dtype == value[name].dtype
+        np.testing.assert_array_equal(decoded[name], value[name])
+    decoded["image"][0, 0] = 1.0  # restored arrays are writable
+
+
+def test_round_trip_without_arrays():
+    codec = Codec()
+    assert frames.decode(frames.encode({"inputs": [1, "two", None]}, codec), codec) == {"inputs": [1, "two", None]}
+
+
+@pytest.mark.parametrize("data", [b"", b"XXXX\x00\x00\x00\x00", b"CLF1\xff\x00\x00\x00{}"])
+def test_malformed_frames_are_rejected(data):
+    with pytest.raises(frames.FrameError):
+        frames.decode(data, Codec())
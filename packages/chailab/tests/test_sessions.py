@@ -0,0 +1,39 @@
+from chailab.sessions import SessionStore
+
+
+def message(content):
+    return {"role": "user", "content": content}
+
+
+def test_least_recently_used_session_is_evicted_over_count():
+    store = SessionStore(max_sessions=2)
+    store.create("a")
+    store.create("b")
+    store.get("a")
+    store.create("c")
+    assert "a" in store and "c" in store
+    assert "b" not in store
+
+
+def test_idle_sessions_expire():
+    store = SessionStore(ttl=60)
+    store.create("a").last_used -= 61
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_memory_budget_evicts_old_sessions():
+    store = SessionStore(max_sessions=None, max_bytes=700)
+    store.create("a", [message("x" * 100)])
+    store.create("b", [message("y" * 100)])
+    store.record(store.get("a"), message("z" * 100))
+    assert "a" in store
+    assert "b" not in store
+    assert store.stats()["bytes"] <= 700
+
+
+def test_discard_releases_bytes():
+    store = SessionStore()
+    store.create("a", [message("hello")])
+    store.discard("a")
+    assert store.stats() == {"sessions": 0, "bytes": 0}